@@ -0,0 +1,73 @@
+"""
+Сравнение результатов бенчмарков с базовым прогоном.
+
+    python -m tests.benchmarks.compare baseline.json bench_results.json --threshold 0.1
+
+Код возврата 1, если медиана хотя бы одного сценария выросла больше чем
+на threshold (доля, 0.1 = 10%) относительно базового прогона или если
+сценарий базового прогона отсутствует в текущем (упавший или пропущенный
+бенчмарк). Удалённые намеренно сценарии разрешает --allow-missing.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['scenarios']
+
+
+def compare(baseline, current, threshold, allow_missing=False):
+    """Возвращает строки отчёта и список сценариев с регрессией (включая пропавшие, если они не разрешены)."""
+    rows = []
+    regressions = []
+    for scenario in sorted(set(baseline) | set(current)):
+        if scenario not in current:
+            if not allow_missing:
+                regressions.append(scenario)
+            rows.append((scenario, baseline[scenario]['median'], None, None, 'missing' if allow_missing else 'MISSING'))
+            continue
+        if scenario not in baseline:
+            rows.append((scenario, None, current[scenario]['median'], None, 'new'))
+            continue
+        before = baseline[scenario]['median']
+        after = current[scenario]['median']
+        change = (after - before) / before if before > 0 else 0.0
+        status = 'ok'
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions.append(scenario)
+        rows.append((scenario, before, after, change, status))
+    return rows, regressions
+
+
+def format_us(value):
+    return '-' if value is None else f"{value * 1e6:.1f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сравнение результатов бенчмарков с базовым прогоном")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="допустимый рост медианы, доля (по умолчанию 0.1 = 10%%)")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="не считать ошибкой сценарии базового прогона, которых нет в текущем")
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(load(args.baseline), load(args.current), args.threshold, args.allow_missing)
+    width = max((len(row[0]) for row in rows), default=8)
+    print(f"{'scenario':<{width}}  {'base µs':>10}  {'curr µs':>10}  {'change':>8}  status")
+    for scenario, before, after, change, status in rows:
+        change_text = '-' if change is None else f"{change:+.1%}"
+        print(f"{scenario:<{width}}  {format_us(before):>10}  {format_us(after):>10}  {change_text:>8}  {status}")
+    if regressions:
+        print(f"\n{len(regressions)} scenario(s) regressed beyond {args.threshold:.0%} or missing")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Фикстуры бенчмарков: замер сценариев и сохранение результатов в JSON.
+
+Результаты всех сценариев сессии пишутся в файл из переменной окружения
+BENCH_JSON (по умолчанию bench_results.json) и сравниваются с базовым
+прогоном командой python -m tests.benchmarks.compare.
+"""
+
+import os
+
+import pytest
+
+from tests.benchmarks.recorder import BenchmarkRecorder
+
+RESULTS_ENV = "BENCH_JSON"
+DEFAULT_RESULTS_PATH = "bench_results.json"
+
+
+@pytest.fixture(scope="session")
+def bench_recorder():
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if recorder.results:
+        recorder.dump(os.environ.get(RESULTS_ENV, DEFAULT_RESULTS_PATH))
+
+
+@pytest.fixture
+def bench(bench_recorder):
+    return bench_recorder
@@ -0,0 +1,63 @@
+"""
+Замер сценариев бенчмарков и сохранение результатов в JSON.
+"""
+
+import inspect
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    median = statistics.median(ordered)
+    return {
+        'rounds': len(ordered),
+        'min': ordered[0],
+        'median': median,
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'ops_per_sec': 1 / median if median > 0 else float('inf'),
+    }
+
+
+class BenchmarkRecorder:
+    def __init__(self):
+        self.results = {}
+
+    async def measure(self, scenario, operation, rounds=20, warmup=1, inner=1):
+        """Замеряет operation (функцию или корутинную функцию) и сохраняет статистику сценария.
+
+        Время одного раунда делится на inner, чтобы короткие операции
+        выполнялись пачкой и не упирались в точность таймера.
+        """
+        for _ in range(warmup):
+            await call(operation)
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(inner):
+                await call(operation)
+            timings.append((time.perf_counter() - started) / inner)
+        result = summarize(timings)
+        self.results[scenario] = result
+        print(f"\n{scenario}: median {result['median'] * 1e6:.1f} µs, {result['ops_per_sec']:.1f} ops/sec")
+        return result
+
+    def dump(self, path):
+        payload = {
+            'created_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'scenarios': dict(sorted(self.results.items())),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+async def call(operation):
+    result = operation()
+    if inspect.isawaitable(result):
+        await result
@@ -0,0 +1,57 @@
+"""
+Бенчмарки расчёта корзины и скидок на больших корзинах.
+CartService.calc_totals, DiscountService.apply_discounts и пакетный расчёт.
+"""
+
+import pytest
+from decimal import Decimal
+from app.services.cart_service import CartService
+from app.services.discount_service import DiscountService
+from app.dto import Cart, CartItem
+
+
+def large_cart(user_id, positions):
+    return Cart(user_id=user_id, items=[
+        CartItem(product_id=i, product_name=f"Товар {i}", price=Decimal(199000 + i) / 100, qty=i % 5 + 1)
+        for i in range(1, positions + 1)
+    ])
+
+
+@pytest.mark.benchmark
+class TestCartBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("positions", [100, 1000])
+    async def test_calc_totals_rate(self, bench, inmemory_backend, positions):
+        """Расчётов итогов в секунду для корзины на 100 и 1000 позиций"""
+        service = CartService(cart_repo=inmemory_backend.cart_repo, product_repo=inmemory_backend.product_repo)
+        cart = large_cart(1, positions)
+        
+        result = await bench.measure(f"calc_totals_{positions}_positions", lambda: service.calc_totals(cart))
+        
+        assert result['ops_per_sec'] > 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("positions", [100, 1000])
+    async def test_apply_discounts_rate(self, bench, inmemory_backend, positions):
+        """Применений промокода SAVE10 в секунду к корзине на 100 и 1000 позиций"""
+        service = DiscountService(promocode_repo=inmemory_backend.promocode_repo)
+        cart = large_cart(1, positions)
+        
+        result = await bench.measure(
+            f"apply_discounts_{positions}_positions", lambda: service.apply_discounts(cart, "SAVE10")
+        )
+        
+        assert result['ops_per_sec'] > 0
+
+    @pytest.mark.asyncio
+    async def test_apply_discounts_batch_rate(self, bench, inmemory_backend):
+        """Пакетный пересчёт 1000 корзин по 20 позиций"""
+        service = DiscountService(promocode_repo=inmemory_backend.promocode_repo)
+        carts = [large_cart(user_id, 20) for user_id in range(1, 1001)]
+        
+        result = await bench.measure(
+            "apply_discounts_batch_1000_carts", lambda: service.apply_discounts_batch(carts, "SAVE10"), rounds=5
+        )
+        
+        assert result['ops_per_sec'] > 0
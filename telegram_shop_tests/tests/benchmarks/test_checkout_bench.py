@@ -0,0 +1,45 @@
+"""
+Бенчмарк оформления заказа с резервированием товара при параллельных покупателях.
+"""
+
+import asyncio
+import pytest
+from itertools import count
+from unittest.mock import AsyncMock
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from app.dto import ContactData
+from tests.inmemory import InMemoryBackend
+
+CUSTOMERS = 100
+
+
+@pytest.mark.benchmark
+class TestCheckoutBenchmark:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_checkout_rate(self, bench):
+        """Оформлений заказа в секунду: 100 покупателей одновременно, резерв одних и тех же товаров"""
+        backend = InMemoryBackend.generate(products=1000, categories=10, users=CUSTOMERS)
+        for product_id in range(1, 11):
+            backend.product_repo.product_record(product_id).stock = 10 ** 9
+        cart_service = CartService(cart_repo=backend.cart_repo, product_repo=backend.product_repo)
+        service = OrderService(
+            order_repo=backend.order_repo, cart_service=cart_service, product_repo=backend.product_repo,
+            notification_service=AsyncMock(), discount_service=AsyncMock()
+        )
+        contact = ContactData(name="Тест", phone="+7 999 111-11-11", address="г. Москва, ул. Тестовая, д. 1")
+        rounds = count()
+        
+        async def checkout_wave():
+            wave = next(rounds)
+            for user_id in range(1, CUSTOMERS + 1):
+                await backend.cart_repo.upsert_cart_item(user_id, (user_id + wave) % 10 + 1, 1)
+            await asyncio.gather(*[
+                service.create_order(user_id=user_id, contact=contact, payment_method='card')
+                for user_id in range(1, CUSTOMERS + 1)
+            ])
+        
+        result = await bench.measure(f"checkout_{CUSTOMERS}_concurrent", checkout_wave, rounds=5)
+        
+        assert result['ops_per_sec'] > 0
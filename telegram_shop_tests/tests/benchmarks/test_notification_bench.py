@@ -0,0 +1,25 @@
+"""
+Бенчмарк рассылки уведомлений администраторам о новом заказе.
+"""
+
+import pytest
+from app.services.notification_service import NotificationService
+from tests.conftest import MockOrder
+
+
+@pytest.mark.benchmark
+class TestNotificationBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("admins", [2, 50])
+    async def test_admin_fanout_rate(self, bench, mock_bot, inmemory_backend, admins):
+        """Уведомлений о новом заказе в секунду при 2 и 50 администраторах"""
+        service = NotificationService(
+            bot=mock_bot, user_repo=inmemory_backend.user_repo,
+            config={'admin_ids': list(range(200001, 200001 + admins))}
+        )
+        order = MockOrder(id=1, user_id=1, order_number="ORD-20241201-0001", total=89990)
+        
+        result = await bench.measure(f"notify_admin_fanout_{admins}", lambda: service.notify_admin_new_order(order))
+        
+        assert result['ops_per_sec'] > 0
@@ -0,0 +1,32 @@
+"""
+Бенчмарки генерации чеков (ReceiptRenderer).
+Замер чеков в секунду для заказов на 1, 20 и 200 позиций.
+"""
+
+import pytest
+from decimal import Decimal
+from app.services.receipt_service import ReceiptService
+from app.services.receipt_renderer import get_receipt_renderer
+from tests.conftest import MockOrderItem
+
+
+@pytest.mark.benchmark
+class TestReceiptBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lines", [1, 20, 200])
+    async def test_receipt_render_rate(self, bench, inmemory_backend, tmp_path, lines):
+        """Чеков в секунду при рендеринге заказа на 1, 20 и 200 позиций"""
+        order = await inmemory_backend.order_repo.get_order_by_id(2)
+        inmemory_backend.order_repo.add_order(order, items=[
+            MockOrderItem(i, 2, 7, f"Чехол для смартфона №{i}", Decimal('1990'), 1)
+            for i in range(1, lines + 1)
+        ])
+        service = ReceiptService(order_repo=inmemory_backend.order_repo, receipts_dir=str(tmp_path))
+        data = await service.get_receipt_data(order_id=2)
+        renderer = get_receipt_renderer()
+        path = str(tmp_path / "receipt.pdf")
+        
+        result = await bench.measure(f"receipt_render_{lines}_lines", lambda: renderer.render(data, path))
+        
+        assert result['ops_per_sec'] > 0
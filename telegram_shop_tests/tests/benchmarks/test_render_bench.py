@@ -0,0 +1,27 @@
+"""
+Бенчмарки рендеринга сообщений (MessageRenderer).
+Замер карточек товаров в секунду без кэша и с кэшем.
+"""
+
+import pytest
+from itertools import cycle
+from app.utils.render import MessageRenderer
+
+
+@pytest.mark.benchmark
+class TestRenderBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cache_size", [0, 1024])
+    async def test_product_card_render_rate(self, bench, test_products, cache_size):
+        """Карточек в секунду без кэша (cache_size=0) и с LRU-кэшем"""
+        renderer = MessageRenderer(cache_size=cache_size)
+        products = cycle([p for p in test_products if p.is_active])
+        
+        result = await bench.measure(
+            f"product_card_render_cache_{cache_size}",
+            lambda: renderer.render_product_card(next(products), catalog_version=1),
+            inner=1000
+        )
+        
+        assert result['ops_per_sec'] > 0
@@ -0,0 +1,47 @@
+"""
+Бенчмарки репозиториев: моки из conftest, InMemoryBackend и SQLiteBackend.
+Замер операций в секунду для типовых выборок и записей.
+"""
+
+import pytest
+from itertools import count
+from tests.inmemory import InMemoryBackend
+from tests.sqlite_backend import SQLiteBackend
+
+
+@pytest.mark.benchmark
+class TestRepositoryBenchmark:
+
+    @pytest.fixture(params=["mock", "inmemory", "sqlite"])
+    def backend(self, request, tmp_path, mock_product_repo, mock_cart_repo, test_categories,
+                test_products, test_users, test_orders, test_promocodes):
+        fixtures = dict(
+            categories=test_categories, products=test_products, users=test_users,
+            orders=test_orders, promocodes=test_promocodes
+        )
+        if request.param == "mock":
+            yield request.param, mock_product_repo, mock_cart_repo
+        elif request.param == "inmemory":
+            backend = InMemoryBackend.from_fixtures(**fixtures)
+            yield request.param, backend.product_repo, backend.cart_repo
+        else:
+            backend = SQLiteBackend(str(tmp_path / "bench.sqlite3")).seed(**fixtures)
+            yield request.param, backend.product_repo, backend.cart_repo
+            backend.close()
+
+    @pytest.mark.asyncio
+    async def test_repository_ops_rate(self, bench, backend):
+        """Операций в секунду: товар по id, товары категории, upsert позиции корзины"""
+        name, product_repo, cart_repo = backend
+        i = count()
+        
+        results = [
+            await bench.measure(f"repo_{name}_fetch_product_by_id",
+                                lambda: product_repo.fetch_product_by_id(next(i) % 10 + 1), inner=100),
+            await bench.measure(f"repo_{name}_fetch_products_by_category",
+                                lambda: product_repo.fetch_products_by_category(next(i) % 5 + 1), inner=100),
+            await bench.measure(f"repo_{name}_upsert_cart_item",
+                                lambda: cart_repo.upsert_cart_item(next(i) % 100, 3, 1), inner=100),
+        ]
+        
+        assert all(result['ops_per_sec'] > 0 for result in results)
@@ -0,0 +1,37 @@
+"""
+Бенчмарки поиска (SearchService) на каталогах 10k и 100k товаров.
+Точные запросы, запросы с опечатками, кириллица и латиница.
+"""
+
+import pytest
+from app.services.search_service import SearchService
+from tests.inmemory import InMemoryBackend
+
+QUERIES = {
+    'exact': "Товар 4242",
+    'typo': "Тоавр 4242",
+    'cyrillic': "товар",
+    'latin': "tovar 4242",
+}
+
+
+@pytest.fixture(scope="module", params=[10_000, 100_000], ids=["10k", "100k"])
+def catalog(request):
+    return request.param, InMemoryBackend.generate(products=request.param, categories=50, users=10)
+
+
+@pytest.mark.benchmark
+class TestSearchBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", list(QUERIES))
+    async def test_search_rate(self, bench, catalog, kind):
+        """Поисковых запросов в секунду по каталогу 10k/100k товаров"""
+        size, backend = catalog
+        service = SearchService(product_repo=backend.product_repo)
+        
+        result = await bench.measure(
+            f"search_{size}_{kind}", lambda: service.search_products(QUERIES[kind]), rounds=5
+        )
+        
+        assert result['ops_per_sec'] > 0
@@ -0,0 +1,42 @@
+"""
+Бенчмарк масштабирования шардированных воркеров по ядрам.
+Воспроизведение записанного потока апдейтов на 1, 2 и 4 воркерах.
+"""
+
+import pytest
+from tests.inmemory import ProductRecord
+from tests.sharding.replay import CATALOG_PRODUCTS, load_updates, record_updates, replay, shop_handler
+from tests.sharding.supervisor import Supervisor
+from tests.sqlite_backend import SQLiteBackend
+
+UPDATES = 20_000
+USERS = 2_000
+
+
+@pytest.fixture(scope="module")
+def recorded_updates(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sharding") / "updates.jsonl"
+    return load_updates(record_updates(str(path), count=UPDATES, users=USERS))
+
+
+@pytest.mark.benchmark
+class TestShardingBenchmark:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [1, 2, 4])
+    async def test_sharded_replay_rate(self, bench, recorded_updates, tmp_path, workers):
+        """Апдейтов в секунду при воспроизведении 20k апдейтов на 1/2/4 воркерах"""
+        store_path = str(tmp_path / "shared.sqlite3")
+        SQLiteBackend(store_path).seed(products=[
+            ProductRecord(product_id, f"Товар {product_id}", 1000, stock=10 ** 9)
+            for product_id in range(1, CATALOG_PRODUCTS + 1)
+        ]).close()
+        
+        with Supervisor(shop_handler, workers=workers, store_path=store_path) as supervisor:
+            result = await bench.measure(
+                f"sharded_replay_{UPDATES}_w{workers}", lambda: replay(supervisor, recorded_updates),
+                rounds=3, warmup=0
+            )
+        
+        print(f"{workers} worker(s): {result['ops_per_sec'] * UPDATES:.0f} updates/sec")
+        assert supervisor.errors == {}
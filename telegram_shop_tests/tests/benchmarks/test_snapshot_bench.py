@@ -0,0 +1,55 @@
+"""
+Бенчмарк старта воркера: прогрев каталога из SQLite против открытия снимка через mmap.
+Каталог 100k товаров.
+"""
+
+import asyncio
+import pytest
+from tests.catalog_snapshot import SnapshotProductRepo, write_snapshot_from_repo
+from tests.inmemory import InMemoryBackend
+from tests.sqlite_backend import SQLiteBackend
+
+PRODUCTS = 100_000
+
+
+@pytest.fixture(scope="module")
+def catalog_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("snapshot")
+    source = InMemoryBackend.generate(products=PRODUCTS, categories=100, users=0)
+    categories = asyncio.run(source.product_repo.fetch_categories())
+    products = list(source.product_repo.product_records())
+    database = str(directory / "shop.sqlite3")
+    SQLiteBackend(database).seed(categories=categories, products=products).close()
+    return database, str(directory / "catalog.snap"), source
+
+
+@pytest.mark.benchmark
+class TestSnapshotBenchmark:
+
+    @pytest.mark.asyncio
+    async def test_worker_startup(self, bench, catalog_files):
+        """Старт воркера: fetch_all_products + поиск из SQLite против открытия снимка и поиска по нему"""
+        database, snapshot_path, source = catalog_files
+        await write_snapshot_from_repo(snapshot_path, 1, source.product_repo)
+        backend = SQLiteBackend(database)
+        
+        async def warm_from_repo():
+            await backend.product_repo.fetch_categories()
+            products = await backend.product_repo.fetch_all_products()
+            index = {}
+            for product in products:
+                for token in product.name.lower().split():
+                    index.setdefault(token, []).append(product.id)
+        
+        def open_snapshot():
+            repo = SnapshotProductRepo(snapshot_path)
+            repo.snapshot.search_rows("товар 4242")
+            repo.snapshot.close()
+        
+        results = [
+            await bench.measure(f"startup_{PRODUCTS}_repo_warmup", warm_from_repo, rounds=3),
+            await bench.measure(f"startup_{PRODUCTS}_snapshot_mmap", open_snapshot, rounds=20),
+        ]
+        backend.close()
+        
+        assert all(result['ops_per_sec'] > 0 for result in results)
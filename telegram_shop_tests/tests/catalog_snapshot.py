@@ -0,0 +1,303 @@
+"""
+Бинарный снимок каталога, который воркеры открывают через mmap только для чтения.
+
+Снимок пишется один раз (атомарно, через временный файл и os.replace) и
+содержит колонки товаров, индекс по категориям и поисковый индекс по
+словам. Идентификаторы, цены (в копейках) и остатки на момент снимка
+читаются как memoryview поверх mmap без копирования, поэтому все воркеры
+делят одни и те же страницы памяти. Актуальные остатки для резервирования
+по-прежнему берутся из общего хранилища; снимок — для витрины и поиска.
+
+Формат (little-endian): заголовок MAGIC, версия формата, версия каталога,
+число товаров и секций, затем таблица секций (имя, смещение, длина).
+Каждая секция выровнена по 8 байтам.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+
+from tests.conftest import MockCategory
+from tests.inmemory import ProductRecord
+from tests.money import from_kopecks, to_kopecks
+
+MAGIC = b'TSCS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHQII')
+SECTION = struct.Struct('<8sQQ')
+ALIGN = 8
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def _pad(size):
+    return -size % ALIGN
+
+
+def write_snapshot(path, version, categories, products):
+    """Пишет снимок каталога и атомарно заменяет им файл path."""
+    products = sorted(products, key=lambda p: p.id)
+    rows = {p.id: row for row, p in enumerate(products)}
+    names = [p.name.encode() for p in products]
+    name_offsets = array('I', [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    by_category = {}
+    for p in products:
+        if p.is_active:
+            by_category.setdefault(p.category_id, []).append(rows[p.id])
+    category_table = array('i')
+    category_rows = array('I')
+    for category_id in sorted(by_category):
+        category_table.extend((category_id, len(category_rows), len(category_rows) + len(by_category[category_id])))
+        category_rows.extend(by_category[category_id])
+
+    postings = {}
+    for row, p in enumerate(products):
+        if p.is_active:
+            for token in dict.fromkeys(tokenize(p.name)):
+                postings.setdefault(token, []).append(row)
+    tokens = sorted(postings)
+    token_blob = [t.encode() for t in tokens]
+    token_offsets = array('I', [0])
+    for token in token_blob:
+        token_offsets.append(token_offsets[-1] + len(token))
+    posting_offsets = array('I', [0])
+    posting_rows = array('I')
+    for token in tokens:
+        posting_rows.extend(postings[token])
+        posting_offsets.append(len(posting_rows))
+
+    sections = [
+        (b'ids', array('q', [p.id for p in products]).tobytes()),
+        (b'prices', array('q', [to_kopecks(p.price) for p in products]).tobytes()),
+        (b'stock', array('i', [p.stock for p in products]).tobytes()),
+        (b'category', array('i', [p.category_id for p in products]).tobytes()),
+        (b'active', bytes(int(p.is_active) for p in products)),
+        (b'name_off', name_offsets.tobytes()),
+        (b'names', b''.join(names)),
+        (b'cat_tab', category_table.tobytes()),
+        (b'cat_rows', category_rows.tobytes()),
+        (b'tok_off', token_offsets.tobytes()),
+        (b'tokens', b''.join(token_blob)),
+        (b'post_off', posting_offsets.tobytes()),
+        (b'postings', posting_rows.tobytes()),
+        (b'cats', json.dumps([
+            [c.id, c.name, c.sort_order, bool(c.is_active)] for c in categories
+        ], ensure_ascii=False).encode()),
+    ]
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    offset += _pad(offset)
+    table = []
+    for name, data in sections:
+        table.append(SECTION.pack(name, offset, len(data)))
+        offset += len(data) + _pad(len(data))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, len(products), len(sections)))
+            f.write(b''.join(table))
+            f.write(b'\0' * _pad(f.tell()))
+            for _, data in sections:
+                f.write(data)
+                f.write(b'\0' * _pad(len(data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+async def write_snapshot_from_repo(path, version, product_repo):
+    """Снимает каталог с основного репозитория (один раз на всех воркеров)."""
+    return write_snapshot(
+        path, version, await product_repo.fetch_categories(), await product_repo.fetch_all_products()
+    )
+
+
+class _Strings:
+    """Последовательность строк поверх блоба и таблицы смещений, декодирует по обращению."""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode()
+
+
+class CatalogSnapshot:
+    """Открытый снимок: колонки — memoryview поверх mmap, объекты товаров создаются по запросу."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.inode = os.fstat(f.fileno()).st_ino
+        self._views = []
+        try:
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self):
+        buffer = self._view(memoryview(self._mmap))
+        try:
+            magic, format_version, _, self.version, self.size, section_count = HEADER.unpack_from(buffer)
+        except struct.error:
+            magic = format_version = None
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a catalog snapshot of format {FORMAT_VERSION}")
+        sections = {}
+        for i in range(section_count):
+            name, offset, length = SECTION.unpack_from(buffer, HEADER.size + i * SECTION.size)
+            sections[name.rstrip(b'\0').decode()] = self._view(buffer[offset:offset + length])
+
+        def section(name, fmt=None):
+            if name not in sections:
+                raise ValueError(f"{self.path}: snapshot section {name!r} is missing")
+            return sections[name] if fmt is None else self._view(sections[name].cast(fmt))
+
+        self.ids = section('ids', 'q')
+        self.prices = section('prices', 'q')
+        self.stock = section('stock', 'i')
+        self.category_ids = section('category', 'i')
+        self.active = section('active')
+        self._names = _Strings(section('name_off', 'I'), section('names'))
+        category_table = section('cat_tab', 'i')
+        self._category_rows = section('cat_rows', 'I')
+        # id категории -> (начало, конец) её строк в cat_rows
+        self._category_index = {
+            category_table[i]: (category_table[i + 1], category_table[i + 2])
+            for i in range(0, len(category_table), 3)
+        }
+        self._tokens = _Strings(section('tok_off', 'I'), section('tokens'))
+        self._posting_offsets = section('post_off', 'I')
+        self._postings = section('postings', 'I')
+        self.categories = [
+            MockCategory(id, name, sort_order, is_active)
+            for id, name, sort_order, is_active in json.loads(bytes(section('cats')))
+        ]
+        self._categories_by_id = {c.id: c for c in self.categories}
+
+    def _view(self, view):
+        """Запоминает memoryview поверх mmap, чтобы close() освободил его до закрытия mmap."""
+        self._views.append(view)
+        return view
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def row_of(self, product_id):
+        row = bisect.bisect_left(self.ids, product_id)
+        return row if row < self.size and self.ids[row] == product_id else None
+
+    def product(self, row):
+        return ProductRecord(
+            self.ids[row], self._names[row], from_kopecks(self.prices[row]),
+            stock=self.stock[row], category_id=self.category_ids[row], is_active=bool(self.active[row])
+        )
+
+    def category_rows(self, category_id):
+        start, end = self._category_index.get(category_id, (0, 0))
+        return self._category_rows[start:end]
+
+    def _token_rows(self, token, prefix=False):
+        start = bisect.bisect_left(self._tokens, token)
+        rows = set()
+        for index in range(start, len(self._tokens)):
+            current = self._tokens[index]
+            if current != token and not (prefix and current.startswith(token)):
+                break
+            rows.update(self._postings[self._posting_offsets[index]:self._posting_offsets[index + 1]])
+        return rows
+
+    def search_rows(self, query):
+        """Строки товаров, содержащих все слова запроса; последнее слово — как префикс."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        rows = None
+        for i, token in enumerate(tokens):
+            matched = self._token_rows(token, prefix=i == len(tokens) - 1)
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                return []
+        return sorted(rows)
+
+
+class SnapshotProductRepo:
+    """Контракт чтения репозитория товаров поверх снимка; записи идут в основной репозиторий."""
+
+    def __init__(self, path):
+        self.path = path
+        self.snapshot = CatalogSnapshot(path)
+
+    def refresh(self):
+        """Переоткрывает снимок, если файл заменён новой версией; True — снимок обновлён.
+
+        Старый снимок не закрывается явно: выданные из него memoryview
+        остаются валидными, пока на них есть ссылки.
+        """
+        if os.stat(self.path).st_ino == self.snapshot.inode:
+            return False
+        self.snapshot = CatalogSnapshot(self.path)
+        return True
+
+    def watch(self, bus):
+        """Обновляет снимок по событию catalog_version из шины инвалидации."""
+        bus.on('catalog_version', lambda event: self.refresh())
+        bus.on('reset', lambda event: self.refresh())
+
+    async def fetch_categories(self):
+        return sorted((c for c in self.snapshot.categories if c.is_active), key=lambda c: c.sort_order)
+
+    async def fetch_category_by_id(self, category_id):
+        return self.snapshot._categories_by_id.get(category_id)
+
+    async def fetch_products_by_category(self, category_id):
+        snapshot = self.snapshot
+        return [snapshot.product(row) for row in snapshot.category_rows(category_id)]
+
+    async def fetch_product_by_id(self, product_id):
+        snapshot = self.snapshot
+        row = snapshot.row_of(product_id)
+        return snapshot.product(row) if row is not None and snapshot.active[row] else None
+
+    async def fetch_products_by_ids(self, product_ids):
+        snapshot = self.snapshot
+        rows = (snapshot.row_of(product_id) for product_id in dict.fromkeys(product_ids))
+        return [snapshot.product(row) for row in rows if row is not None and snapshot.active[row]]
+
+    async def fetch_all_products(self):
+        snapshot = self.snapshot
+        return [snapshot.product(row) for row in range(snapshot.size) if snapshot.active[row]]
+
+    async def count_products_in_category(self, category_id):
+        return len(self.snapshot.category_rows(category_id))
+
+    async def search_products(self, query):
+        snapshot = self.snapshot
+        return [snapshot.product(row) for row in snapshot.search_rows(query)]
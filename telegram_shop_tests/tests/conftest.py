@@ -98,18 +98,75 @@ class MockFavorite:
         self.product_id = product_id
 
 
+class MockRetryAfter(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class MockForbidden(Exception):
+    def __init__(self, chat_id):
+        super().__init__(f"Forbidden: bot was blocked by the user {chat_id}")
+        self.chat_id = chat_id
+
+
+class MockClock:
+    def __init__(self, start=0.0):
+        self.current = start
+    
+    def monotonic(self):
+        return self.current
+    
+    async def sleep(self, seconds):
+        self.current += max(seconds, 0)
+        await asyncio.sleep(0)
+
+
 class MockBot:
-    def __init__(self):
+    def __init__(self, clock=None):
         self.sent_messages = []
         self.sent_documents = []
+        self.clock = clock
+        self.retry_after = {}
+        self.blocked_chats = set()
     
     async def send_message(self, chat_id, text, **kwargs):
-        self.sent_messages.append({'chat_id': chat_id, 'text': text, **kwargs})
+        if chat_id in self.blocked_chats:
+            raise MockForbidden(chat_id)
+        if chat_id in self.retry_after:
+            raise MockRetryAfter(self.retry_after.pop(chat_id))
+        message = {'chat_id': chat_id, 'text': text, **kwargs}
+        if self.clock is not None:
+            message['sent_at'] = self.clock.monotonic()
+        self.sent_messages.append(message)
         return MagicMock()
     
     async def send_document(self, chat_id, document, caption='', **kwargs):
         self.sent_documents.append({'chat_id': chat_id, 'document': document, 'caption': caption})
-        return MagicMock()
+        message = MagicMock()
+        message.document.file_id = f"file-id-{len(self.sent_documents)}"
+        return message
+
+
+class MockBus:
+    def __init__(self):
+        self.published = []
+        self._handlers = {}
+    
+    def on(self, kind, callback):
+        self._handlers.setdefault(kind, []).append(callback)
+    
+    async def publish(self, kind, **payload):
+        self.published.append({'type': kind, **payload})
+        return len(self.published)
+    
+    async def deliver(self, kind, **payload):
+        """Имитирует событие, опубликованное другим процессом."""
+        event = {'type': kind, **payload}
+        for callback in self._handlers.get(kind, ()):
+            result = callback(event)
+            if asyncio.iscoroutine(result):
+                await result
 
 
 # ==================== ТЕСТОВЫЕ ДАННЫЕ ====================
@@ -204,6 +261,10 @@ def mock_product_repo(test_products, test_categories):
     async def fetch_all_products():
         return [p for p in test_products if p.is_active]
     
+    async def fetch_products_by_ids(product_ids):
+        wanted = set(product_ids)
+        return [p for p in test_products if p.id in wanted and p.is_active]
+    
     async def insert_product(data):
         new_id = max(p.id for p in test_products) + 1
         new_product = MockProduct(new_id, data.name, data.price, data.stock, data.category_id)
@@ -249,8 +310,9 @@ def mock_product_repo(test_products, test_categories):
     repo.fetch_category_by_id = fetch_category_by_id
     repo.fetch_category_by_name = fetch_category_by_name
     repo.fetch_products_by_category = fetch_products_by_category
-    repo.fetch_product_by_id = fetch_product_by_id
+    repo.fetch_product_by_id = AsyncMock(side_effect=fetch_product_by_id)
     repo.fetch_all_products = fetch_all_products
+    repo.fetch_products_by_ids = AsyncMock(side_effect=fetch_products_by_ids)
     repo.insert_product = insert_product
     repo.update_product = update_product
     repo.delete_product = delete_product
@@ -301,6 +363,7 @@ def mock_cart_repo():
 @pytest.fixture
 def mock_order_repo(test_orders):
     repo = AsyncMock()
+    order_items = {}
     
     async def get_order_by_id(order_id):
         return next((o for o in test_orders if o.id == order_id), None)
@@ -313,9 +376,23 @@ def mock_order_repo(test_orders):
             if o.id == order_id:
                 o.status = status
     
+    async def get_orders_by_ids(order_ids):
+        wanted = set(order_ids)
+        return [o for o in test_orders if o.id in wanted]
+    
+    async def list_paid_orders(date_from, date_to):
+        return [o for o in test_orders if o.status == 'paid' and date_from <= o.created_at < date_to]
+    
+    async def get_order_items_batch(order_ids):
+        return {order_id: order_items.get(order_id, []) for order_id in order_ids}
+    
     repo.get_order_by_id = get_order_by_id
     repo.list_orders_by_user = list_orders_by_user
     repo.update_order_status = update_order_status
+    repo.get_orders_by_ids = AsyncMock(side_effect=get_orders_by_ids)
+    repo.list_paid_orders = list_paid_orders
+    repo.get_order_items_batch = AsyncMock(side_effect=get_order_items_batch)
+    repo._items = order_items
     
     return repo
 
@@ -331,14 +408,34 @@ def mock_user_repo(test_users):
         user = next((u for u in test_users if u.id == user_id), None)
         return user.is_admin if user else False
     
+    async def get_users_by_ids(user_ids):
+        wanted = set(user_ids)
+        return [u for u in test_users if u.id in wanted]
+    
+    async def update_user(user_id, data):
+        user = next((u for u in test_users if u.id == user_id), None)
+        if user is None:
+            return None
+        for field in ('name', 'phone', 'address'):
+            value = getattr(data, field, None)
+            if value is not None:
+                setattr(user, field, value)
+        return user
+    
+    async def list_users_page(after_id=0, limit=100):
+        return sorted((u for u in test_users if u.id > after_id), key=lambda u: u.id)[:limit]
+    
     repo.get_user_by_id = get_user_by_id
     repo.is_admin = is_admin
+    repo.get_users_by_ids = AsyncMock(side_effect=get_users_by_ids)
+    repo.update_user = AsyncMock(side_effect=update_user)
+    repo.list_users_page = AsyncMock(side_effect=list_users_page)
     
     return repo
 
 
 @pytest.fixture
-def mock_favorites_repo():
+def mock_favorites_repo(test_products):
     repo = AsyncMock()
     favorites = {}
     
@@ -358,10 +455,24 @@ def mock_favorites_repo():
     async def exists_favorite(user_id, product_id):
         return user_id in favorites and product_id in favorites[user_id]
     
+    async def exists_favorites(pairs):
+        return [user_id in favorites and product_id in favorites[user_id] for user_id, product_id in pairs]
+    
+    async def get_favorite_ids(user_id):
+        return set(favorites.get(user_id, []))
+    
+    async def get_favorite_products(user_id, limit=None, offset=0):
+        products = {p.id: p for p in test_products if p.is_active}
+        rows = [products[pid] for pid in favorites.get(user_id, []) if pid in products]
+        return rows[offset:offset + limit] if limit is not None else rows[offset:]
+    
     repo.get_favorites = get_favorites
     repo.add_favorite = add_favorite
     repo.remove_favorite = remove_favorite
     repo.exists_favorite = exists_favorite
+    repo.exists_favorites = AsyncMock(side_effect=exists_favorites)
+    repo.get_favorite_ids = AsyncMock(side_effect=get_favorite_ids)
+    repo.get_favorite_products = AsyncMock(side_effect=get_favorite_products)
     repo._data = favorites
     
     return repo
@@ -381,13 +492,64 @@ def mock_promocode_repo(test_promocodes):
     async def record_usage(code, user_id, order_id):
         usage[(code.upper(), user_id)] = True
     
-    repo.get_promocode_by_code = get_promocode_by_code
+    async def list_usages():
+        return list(usage.keys())
+    
+    async def update_promocode(code, data):
+        promocode = await get_promocode_by_code(code)
+        if promocode is None:
+            return None
+        for field in ('discount_value', 'valid_to', 'is_used'):
+            value = getattr(data, field, None)
+            if value is not None:
+                setattr(promocode, field, value)
+        return promocode
+    
+    async def record_usage_batch(records):
+        for code, user_id, order_id in records:
+            usage[(code.upper(), user_id)] = True
+    
+    repo.get_promocode_by_code = AsyncMock(side_effect=get_promocode_by_code)
     repo.check_user_usage = check_user_usage
     repo.record_usage = record_usage
+    repo.list_usages = list_usages
+    repo.update_promocode = AsyncMock(side_effect=update_promocode)
+    repo.record_usage_batch = AsyncMock(side_effect=record_usage_batch)
+    repo._usage = usage
     
     return repo
 
 
+@pytest.fixture
+def inmemory_backend(test_categories, test_products, test_users, test_orders, test_promocodes):
+    from tests.inmemory import InMemoryBackend
+    return InMemoryBackend.from_fixtures(
+        categories=test_categories, products=test_products, users=test_users,
+        orders=test_orders, promocodes=test_promocodes
+    )
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, test_categories, test_products, test_users, test_orders, test_promocodes):
+    from tests.sqlite_backend import SQLiteBackend
+    backend = SQLiteBackend(str(tmp_path / "shop.sqlite3")).seed(
+        categories=test_categories, products=test_products, users=test_users,
+        orders=test_orders, promocodes=test_promocodes
+    )
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def mock_clock():
+    return MockClock()
+
+
+@pytest.fixture
+def mock_bus():
+    return MockBus()
+
+
 @pytest.fixture
 def mock_bot():
     return MockBot()
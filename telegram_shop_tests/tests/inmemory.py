@@ -0,0 +1,398 @@
+"""
+In-memory бэкенд репозиториев для нагрузочного тестирования и бенчмарков.
+
+Реализует контракты репозиториев товаров, корзин, заказов, пользователей,
+избранного и промокодов на словарях с вторичными индексами (по категории,
+по пользователю, по коду, оплаченные заказы по дате), поэтому выборки не
+зависят от размера каталога. Новые id выдаются счётчиками, без просмотра
+всех записей.
+"""
+
+import bisect
+import os
+import pickle
+import random
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+
+from tests.conftest import MockCategory, MockFavorite
+
+
+class ProductRecord:
+    __slots__ = ('id', 'name', 'price', 'stock', 'category_id', 'is_active', 'description', 'created_at')
+
+    def __init__(self, id, name, price, stock=10, category_id=1, is_active=True,
+                 description='', created_at=None):
+        self.id = id
+        self.name = name
+        self.price = price if isinstance(price, Decimal) else Decimal(str(price))
+        self.stock = stock
+        self.category_id = category_id
+        self.is_active = is_active
+        self.description = description
+        self.created_at = created_at or datetime.utcnow()
+
+
+class UserRecord:
+    __slots__ = ('id', 'telegram_id', 'name', 'phone', 'address', 'is_admin', 'created_at')
+
+    def __init__(self, id, telegram_id, name='', phone='', address='', is_admin=False,
+                 created_at=None):
+        self.id = id
+        self.telegram_id = telegram_id
+        self.name = name
+        self.phone = phone
+        self.address = address
+        self.is_admin = is_admin
+        self.created_at = created_at
+
+
+class InMemoryProductRepo:
+    def __init__(self):
+        self._products = {}
+        self._categories = {}
+        self._category_by_name = {}
+        self._active_by_category = {}
+        self._next_product_id = 1
+        self._next_category_id = 1
+
+    def add_category(self, category):
+        self._categories[category.id] = category
+        self._category_by_name[category.name] = category
+        self._active_by_category.setdefault(category.id, {})
+        self._next_category_id = max(self._next_category_id, category.id + 1)
+        return category
+
+    def add_product(self, product):
+        self._products[product.id] = product
+        self._next_product_id = max(self._next_product_id, product.id + 1)
+        if product.is_active:
+            self._active_by_category.setdefault(product.category_id, {})[product.id] = product
+        return product
+
+    def _reindex(self, product, old_category_id):
+        self._active_by_category.get(old_category_id, {}).pop(product.id, None)
+        if product.is_active:
+            self._active_by_category.setdefault(product.category_id, {})[product.id] = product
+
+    def product_record(self, product_id):
+        """Запись товара по id, включая неактивные (для соседних репозиториев и подготовки данных)."""
+        return self._products.get(product_id)
+
+    def product_records(self):
+        return self._products.values()
+
+    async def fetch_categories(self):
+        return sorted((c for c in self._categories.values() if c.is_active), key=lambda c: c.sort_order)
+
+    async def fetch_category_by_id(self, category_id):
+        return self._categories.get(category_id)
+
+    async def fetch_category_by_name(self, name):
+        return self._category_by_name.get(name)
+
+    async def fetch_products_by_category(self, category_id):
+        return list(self._active_by_category.get(category_id, {}).values())
+
+    async def fetch_product_by_id(self, product_id):
+        product = self._products.get(product_id)
+        return product if product is not None and product.is_active else None
+
+    async def fetch_products_by_ids(self, product_ids):
+        products = (self._products.get(product_id) for product_id in dict.fromkeys(product_ids))
+        return [p for p in products if p is not None and p.is_active]
+
+    async def fetch_all_products(self):
+        return [p for p in self._products.values() if p.is_active]
+
+    async def insert_product(self, data):
+        product = ProductRecord(self._next_product_id, data.name, data.price, data.stock, data.category_id)
+        return self.add_product(product)
+
+    async def update_product(self, product_id, data):
+        product = self._products.get(product_id)
+        if product is None:
+            return None
+        old_category_id = product.category_id
+        for field in ('name', 'price', 'stock', 'category_id', 'description'):
+            value = getattr(data, field, None)
+            if value is not None:
+                setattr(product, field, Decimal(str(value)) if field == 'price' else value)
+        self._reindex(product, old_category_id)
+        return product
+
+    async def delete_product(self, product_id):
+        product = self._products.get(product_id)
+        if product is None:
+            return False
+        product.is_active = False
+        self._reindex(product, product.category_id)
+        return True
+
+    async def insert_category(self, name):
+        new_id = self._next_category_id
+        return self.add_category(MockCategory(new_id, name, new_id))
+
+    async def delete_category(self, category_id):
+        category = self._categories.get(category_id)
+        if category is None:
+            return False
+        category.is_active = False
+        return True
+
+    async def count_products_in_category(self, category_id):
+        return len(self._active_by_category.get(category_id, {}))
+
+
+class InMemoryCartRepo:
+    def __init__(self, product_repo):
+        self._product_repo = product_repo
+        self._carts = {}
+
+    async def get_cart_items(self, user_id):
+        items = []
+        for product_id, qty in self._carts.get(user_id, {}).items():
+            product = self._product_repo.product_record(product_id)
+            if product is None:
+                continue
+            items.append({
+                'product_id': product_id, 'qty': qty, 'name': product.name,
+                'price': product.price, 'stock': product.stock, 'is_active': product.is_active
+            })
+        return items
+
+    async def upsert_cart_item(self, user_id, product_id, qty):
+        self._carts.setdefault(user_id, {})[product_id] = qty
+
+    async def delete_cart_item(self, user_id, product_id):
+        self._carts.get(user_id, {}).pop(product_id, None)
+
+    async def clear_cart(self, user_id):
+        self._carts.pop(user_id, None)
+
+
+class InMemoryOrderRepo:
+    def __init__(self):
+        self._orders = {}
+        self._by_user = {}
+        self._items = {}
+        # (created_at, id) оплаченных заказов по возрастанию; статус меняется через update_order_status
+        self._paid_by_date = []
+
+    def add_order(self, order, items=()):
+        previous = self._orders.get(order.id)
+        if previous is not None and previous.status == 'paid':
+            self._unindex_paid(previous)
+        self._orders[order.id] = order
+        self._by_user.setdefault(order.user_id, {})[order.id] = order
+        self._items[order.id] = list(items)
+        if order.status == 'paid':
+            bisect.insort(self._paid_by_date, (order.created_at, order.id))
+        return order
+
+    def _unindex_paid(self, order):
+        index = bisect.bisect_left(self._paid_by_date, (order.created_at, order.id))
+        if index < len(self._paid_by_date) and self._paid_by_date[index] == (order.created_at, order.id):
+            del self._paid_by_date[index]
+
+    async def insert_order(self, order, items=()):
+        return self.add_order(order, items)
+
+    async def get_order_by_id(self, order_id):
+        return self._orders.get(order_id)
+
+    async def get_orders_by_ids(self, order_ids):
+        orders = (self._orders.get(order_id) for order_id in dict.fromkeys(order_ids))
+        return [o for o in orders if o is not None]
+
+    async def list_orders_by_user(self, user_id):
+        return list(self._by_user.get(user_id, {}).values())
+
+    async def list_paid_orders(self, date_from, date_to):
+        start = bisect.bisect_left(self._paid_by_date, (date_from,))
+        end = bisect.bisect_left(self._paid_by_date, (date_to,))
+        return [self._orders[order_id] for _, order_id in self._paid_by_date[start:end]]
+
+    async def update_order_status(self, order_id, status):
+        order = self._orders.get(order_id)
+        if order is None or order.status == status:
+            return
+        if order.status == 'paid':
+            self._unindex_paid(order)
+        order.status = status
+        if status == 'paid':
+            bisect.insort(self._paid_by_date, (order.created_at, order.id))
+
+    async def get_order_items(self, order_id):
+        return list(self._items.get(order_id, []))
+
+    async def get_order_items_batch(self, order_ids):
+        return {order_id: list(self._items.get(order_id, [])) for order_id in order_ids}
+
+
+class InMemoryUserRepo:
+    def __init__(self):
+        self._users = {}
+        self._sorted_ids = []
+
+    def add_user(self, user):
+        if user.id not in self._users:
+            bisect.insort(self._sorted_ids, user.id)
+        self._users[user.id] = user
+        return user
+
+    async def get_user_by_id(self, user_id):
+        return self._users.get(user_id)
+
+    async def get_users_by_ids(self, user_ids):
+        users = (self._users.get(user_id) for user_id in dict.fromkeys(user_ids))
+        return [u for u in users if u is not None]
+
+    async def is_admin(self, user_id):
+        user = self._users.get(user_id)
+        return user.is_admin if user else False
+
+    async def update_user(self, user_id, data):
+        user = self._users.get(user_id)
+        if user is None:
+            return None
+        for field in ('name', 'phone', 'address'):
+            value = getattr(data, field, None)
+            if value is not None:
+                setattr(user, field, value)
+        return user
+
+    async def list_users_page(self, after_id=0, limit=100):
+        start = bisect.bisect_right(self._sorted_ids, after_id)
+        return [self._users[user_id] for user_id in self._sorted_ids[start:start + limit]]
+
+
+class InMemoryFavoritesRepo:
+    def __init__(self, product_repo):
+        self._product_repo = product_repo
+        self._favorites = {}
+
+    async def get_favorites(self, user_id):
+        return [MockFavorite(i, user_id, product_id)
+                for i, product_id in enumerate(self._favorites.get(user_id, {}))]
+
+    async def add_favorite(self, user_id, product_id):
+        self._favorites.setdefault(user_id, {}).setdefault(product_id, None)
+
+    async def remove_favorite(self, user_id, product_id):
+        self._favorites.get(user_id, {}).pop(product_id, None)
+
+    async def exists_favorite(self, user_id, product_id):
+        return product_id in self._favorites.get(user_id, {})
+
+    async def exists_favorites(self, pairs):
+        return [product_id in self._favorites.get(user_id, {}) for user_id, product_id in pairs]
+
+    async def get_favorite_ids(self, user_id):
+        return set(self._favorites.get(user_id, {}))
+
+    async def get_favorite_products(self, user_id, limit=None, offset=0):
+        records = (self._product_repo.product_record(product_id) for product_id in self._favorites.get(user_id, {}))
+        rows = [p for p in records if p is not None and p.is_active]
+        return rows[offset:offset + limit] if limit is not None else rows[offset:]
+
+
+class InMemoryPromocodeRepo:
+    def __init__(self):
+        self._by_code = {}
+        self._usage = set()
+
+    def add_promocode(self, promocode):
+        self._by_code[promocode.code.upper()] = promocode
+        return promocode
+
+    async def get_promocode_by_code(self, code):
+        return self._by_code.get(code.upper())
+
+    async def update_promocode(self, code, data):
+        promocode = self._by_code.get(code.upper())
+        if promocode is None:
+            return None
+        for field in ('discount_value', 'valid_to', 'is_used'):
+            value = getattr(data, field, None)
+            if value is not None:
+                setattr(promocode, field, value)
+        return promocode
+
+    async def check_user_usage(self, code, user_id):
+        return (code.upper(), user_id) in self._usage
+
+    async def record_usage(self, code, user_id, order_id):
+        self._usage.add((code.upper(), user_id))
+
+    async def list_usages(self):
+        return list(self._usage)
+
+    async def record_usage_batch(self, records):
+        self._usage.update((code.upper(), user_id) for code, user_id, order_id in records)
+
+
+class InMemoryBackend:
+    """Набор in-memory репозиториев с общим каталогом и снимком на диск."""
+
+    def __init__(self):
+        self.product_repo = InMemoryProductRepo()
+        self.cart_repo = InMemoryCartRepo(self.product_repo)
+        self.order_repo = InMemoryOrderRepo()
+        self.user_repo = InMemoryUserRepo()
+        self.favorites_repo = InMemoryFavoritesRepo(self.product_repo)
+        self.promocode_repo = InMemoryPromocodeRepo()
+
+    @classmethod
+    def from_fixtures(cls, categories=(), products=(), users=(), orders=(), promocodes=()):
+        backend = cls()
+        for category in categories:
+            backend.product_repo.add_category(category)
+        for product in products:
+            backend.product_repo.add_product(product)
+        for user in users:
+            backend.user_repo.add_user(user)
+        for order in orders:
+            backend.order_repo.add_order(order)
+        for promocode in promocodes:
+            backend.promocode_repo.add_promocode(promocode)
+        return backend
+
+    @classmethod
+    def generate(cls, products=1_000_000, categories=100, users=10_000, seed=0):
+        """Генерирует каталог заданного размера с детерминированными ценами и остатками."""
+        rnd = random.Random(seed)
+        backend = cls()
+        created_at = datetime.utcnow()
+        for category_id in range(1, categories + 1):
+            backend.product_repo.add_category(MockCategory(category_id, f"Категория {category_id}", category_id))
+        for product_id in range(1, products + 1):
+            backend.product_repo.add_product(ProductRecord(
+                product_id, f"Товар {product_id}", Decimal(rnd.randrange(100, 300_000)),
+                stock=rnd.randrange(0, 100), category_id=product_id % categories + 1,
+                created_at=created_at
+            ))
+        for user_id in range(1, users + 1):
+            backend.user_repo.add_user(UserRecord(
+                user_id, 100000 + user_id, f"Пользователь {user_id}", created_at=created_at
+            ))
+        return backend
+
+    def snapshot(self, path):
+        """Атомарно сохраняет состояние всех репозиториев в файл."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
@@ -0,0 +1,46 @@
+"""
+Запуск нагрузочного прогона сценариев А1-А12.
+
+    python -m tests.load --users 2000 --ramp-up 10 --think-time 0.5 --duration 60
+
+Отчёт печатается в консоль; с --json дополнительно сохраняется в файл.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from tests.load.journeys import ShopApp, build_journeys
+from tests.load.loadgen import LoadGenerator, format_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон сценариев А1-А12 на in-memory бэкенде")
+    parser.add_argument('--users', type=int, default=1000, help="число виртуальных пользователей")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="окно разгона, секунды")
+    parser.add_argument('--think-time', type=float, default=0.2, help="средняя пауза между шагами, секунды")
+    parser.add_argument('--duration', type=float, default=None, help="длительность прогона, секунды")
+    parser.add_argument('--iterations', type=int, default=5,
+                        help="сценариев на пользователя, если не задан --duration")
+    parser.add_argument('--products', type=int, default=10_000, help="размер каталога")
+    parser.add_argument('--api-latency', type=float, default=0.05, help="задержка ответа Telegram API, секунды")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="путь для сохранения отчёта в JSON")
+    args = parser.parse_args(argv)
+
+    app = ShopApp.build(products=args.products, users=args.users, api_latency=args.api_latency, seed=args.seed)
+    generator = LoadGenerator(
+        build_journeys(app, args.users), users=args.users, ramp_up=args.ramp_up,
+        think_time=args.think_time, iterations=args.iterations, duration=args.duration, seed=args.seed
+    )
+    report = asyncio.run(generator.run())
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Сценарии нагрузки по приёмочным тестам А1-А12.
+
+Каждый сценарий — корутина от UserSession, разбитая на именованные шаги
+(session.step), между шагами пользователь «думает» (session.think).
+Сервисы работают поверх InMemoryBackend, Telegram API заменён MockBot
+с настраиваемой задержкой ответа.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from itertools import count
+
+from app.dto import ContactData, ProfileUpdate
+from app.exceptions import EmptyCartError, InsufficientStockError
+from app.services.cart_service import CartService
+from app.services.catalog_service import CatalogService
+from app.services.discount_service import DiscountService
+from app.services.favorites_service import FavoritesService
+from app.services.notification_service import NotificationService
+from app.services.order_service import OrderService
+from app.services.profile_service import ProfileService
+from app.services.search_service import SearchService
+from tests.conftest import MockBot, MockPromocode
+from tests.inmemory import InMemoryBackend, UserRecord
+
+HOT_PRODUCTS = 100
+SOLD_OUT_PRODUCT_ID = HOT_PRODUCTS + 1
+# допустимая цепочка статусов, которую администратор проходит по одному заказу
+ADMIN_STATUS_CHAIN = ('confirmed', 'shipped', 'delivered')
+
+
+class LatencyBot(MockBot):
+    """MockBot, отвечающий с задержкой сетевого вызова Telegram API."""
+
+    def __init__(self, api_latency=0.0, clock=None):
+        super().__init__(clock=clock)
+        self.api_latency = api_latency
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.api_latency > 0:
+            await asyncio.sleep(self.api_latency)
+        return await super().send_message(chat_id, text, **kwargs)
+
+    async def send_document(self, chat_id, document, caption='', **kwargs):
+        if self.api_latency > 0:
+            await asyncio.sleep(self.api_latency)
+        return await super().send_document(chat_id, document, caption, **kwargs)
+
+
+class ShopApp:
+    """Сервисы магазина, собранные поверх одного in-memory бэкенда."""
+
+    def __init__(self, backend, bot, admin_ids):
+        self.backend = backend
+        self.bot = bot
+        self.admin_ids = admin_ids
+        self.catalog_service = CatalogService(product_repo=backend.product_repo)
+        self.search_service = SearchService(product_repo=backend.product_repo)
+        self.cart_service = CartService(cart_repo=backend.cart_repo, product_repo=backend.product_repo)
+        self.discount_service = DiscountService(promocode_repo=backend.promocode_repo)
+        self.notification_service = NotificationService(
+            bot=bot, user_repo=backend.user_repo, config={'admin_ids': [a.telegram_id for a in admin_ids]}
+        )
+        self.order_service = OrderService(
+            order_repo=backend.order_repo, cart_service=self.cart_service,
+            product_repo=backend.product_repo, notification_service=self.notification_service,
+            discount_service=self.discount_service
+        )
+        self.favorites_service = FavoritesService(
+            favorites_repo=backend.favorites_repo, product_repo=backend.product_repo
+        )
+        self.profile_service = ProfileService(
+            user_repo=backend.user_repo, order_repo=backend.order_repo, cart_service=self.cart_service
+        )
+
+    @classmethod
+    def build(cls, products=10_000, categories=50, users=10_000, api_latency=0.0, seed=0):
+        backend = InMemoryBackend.generate(products=products, categories=categories, users=users, seed=seed)
+        for product_id in range(1, HOT_PRODUCTS + 1):
+            backend.product_repo.product_record(product_id).stock = 10 ** 9
+        backend.product_repo.product_record(SOLD_OUT_PRODUCT_ID).stock = 0
+        admins = [
+            backend.user_repo.add_user(UserRecord(users + i, 100000 + users + i, f"Админ {i}", is_admin=True))
+            for i in (1, 2)
+        ]
+        now = datetime.utcnow()
+        backend.promocode_repo.add_promocode(MockPromocode(1, "SAVE10", "percent", 10))
+        backend.promocode_repo.add_promocode(MockPromocode(
+            2, "OLD", "percent", 15, now - timedelta(days=730), now - timedelta(days=365)
+        ))
+        return cls(backend, LatencyBot(api_latency=api_latency), admins)
+
+
+def build_journeys(app, users):
+    """Возвращает {название: (вес, сценарий)}; веса отражают реальную долю трафика."""
+    contact = ContactData(name="Тест", phone="+7 999 111-11-11", address="г. Москва, ул. Тестовая, д. 1")
+    statuses = count()
+
+    def user_id_of(session):
+        return session.user_index % users + 1
+
+    def hot_product(session):
+        return session.random.randrange(1, HOT_PRODUCTS + 1)
+
+    async def checkout(session, user_id):
+        async with session.step('order.create'):
+            order = await app.order_service.create_order(user_id=user_id, contact=contact, payment_method='card')
+        session.state['last_order_id'] = order.id
+        return order
+
+    async def a01_full_journey(session):
+        user_id = user_id_of(session)
+        async with session.step('catalog.categories'):
+            categories = await app.catalog_service.get_categories()
+        await session.think()
+        async with session.step('catalog.products'):
+            await app.catalog_service.get_products_by_category(session.random.choice(categories).id)
+        await session.think()
+        product_id = hot_product(session)
+        async with session.step('catalog.product'):
+            await app.catalog_service.get_product(product_id)
+        await session.think()
+        async with session.step('cart.add'):
+            await app.cart_service.add_item(user_id=user_id, product_id=product_id, qty=1)
+        await session.think()
+        await checkout(session, user_id)
+
+    async def a02_search_and_buy(session):
+        user_id = user_id_of(session)
+        product_id = hot_product(session)
+        async with session.step('search'):
+            await app.search_service.search_products(f"Товар {product_id}")
+        await session.think()
+        async with session.step('cart.add'):
+            await app.cart_service.add_item(user_id=user_id, product_id=product_id, qty=1)
+        await session.think()
+        await checkout(session, user_id)
+
+    async def a03_promo_checkout(session):
+        user_id = user_id_of(session)
+        async with session.step('cart.add'):
+            await app.cart_service.add_item(user_id=user_id, product_id=hot_product(session), qty=1)
+        await session.think()
+        async with session.step('promo.apply'):
+            cart = await app.cart_service.get_cart(user_id=user_id)
+            await app.discount_service.apply_discounts(cart, "SAVE10")
+        await session.think()
+        await checkout(session, user_id)
+
+    async def a04_repeat_order(session):
+        user_id = user_id_of(session)
+        if 'last_order_id' not in session.state:
+            await a01_full_journey(session)
+            await session.think()
+        async with session.step('order.history'):
+            await app.profile_service.get_order_history(user_id=user_id, limit=10)
+        await session.think()
+        async with session.step('order.repeat'):
+            await app.profile_service.repeat_order(user_id=user_id, order_id=session.state['last_order_id'])
+        await session.think()
+        await checkout(session, user_id)
+
+    async def a05_favorites_to_cart(session):
+        user_id = user_id_of(session)
+        product_id = hot_product(session)
+        async with session.step('favorites.add'):
+            await app.favorites_service.add_favorite(user_id=user_id, product_id=product_id)
+        await session.think()
+        async with session.step('favorites.list'):
+            await app.favorites_service.list_favorites(user_id=user_id, limit=10, offset=0)
+        await session.think()
+        async with session.step('cart.add'):
+            await app.cart_service.add_item(user_id=user_id, product_id=product_id, qty=1)
+
+    async def a06_update_profile(session):
+        user_id = user_id_of(session)
+        async with session.step('profile.get'):
+            await app.profile_service.get_profile(user_id=user_id)
+        await session.think()
+        async with session.step('profile.update'):
+            await app.profile_service.update_profile(
+                user_id=user_id, data=ProfileUpdate(phone=f"+7 999 {user_id % 1000:03d}-00-00")
+            )
+
+    async def a07_out_of_stock(session):
+        async with session.step('cart.add_sold_out'):
+            try:
+                await app.cart_service.add_item(user_id=user_id_of(session), product_id=SOLD_OUT_PRODUCT_ID, qty=1)
+            except InsufficientStockError:
+                pass
+
+    async def a08_expired_promo(session):
+        async with session.step('promo.validate_expired'):
+            await app.discount_service.validate_promo("OLD", datetime.utcnow())
+
+    async def a09_empty_cart_checkout(session):
+        user_id = user_id_of(session)
+        await app.cart_service.clear_cart(user_id)
+        async with session.step('order.create_empty'):
+            try:
+                await app.order_service.create_order(user_id=user_id, contact=contact, payment_method='card')
+            except EmptyCartError:
+                pass
+
+    async def a10_search_no_results(session):
+        async with session.step('search.no_results'):
+            await app.search_service.search_products("несуществующий запрос xyz")
+
+    async def a11_a12_admin_status(session):
+        # статус заказа двигается только вперёд; после delivered администратор берёт новый заказ
+        if not session.state.get('admin_statuses'):
+            if session.state.get('last_order_id') in (None, session.state.get('admin_order_id')):
+                await a01_full_journey(session)
+            session.state['admin_order_id'] = session.state['last_order_id']
+            session.state['admin_statuses'] = list(ADMIN_STATUS_CHAIN)
+        order_id = session.state['admin_order_id']
+        await session.think()
+        async with session.step('admin.update_status'):
+            await app.order_service.update_status(order_id=order_id, status=session.state['admin_statuses'].pop(0))
+        if next(statuses) % 50 == 0:
+            async with session.step('admin.notify'):
+                await app.notification_service.notify_admin_new_order(
+                    await app.order_service.get_order(order_id=order_id, user_id=user_id_of(session))
+                )
+
+    return {
+        'a01_full_journey': (20, a01_full_journey),
+        'a02_search_and_buy': (20, a02_search_and_buy),
+        'a03_promo_checkout': (10, a03_promo_checkout),
+        'a04_repeat_order': (10, a04_repeat_order),
+        'a05_favorites_to_cart': (10, a05_favorites_to_cart),
+        'a06_update_profile': (5, a06_update_profile),
+        'a07_out_of_stock': (5, a07_out_of_stock),
+        'a08_expired_promo': (5, a08_expired_promo),
+        'a09_empty_cart_checkout': (3, a09_empty_cart_checkout),
+        'a10_search_no_results': (10, a10_search_no_results),
+        'a11_a12_admin_status': (2, a11_a12_admin_status),
+    }
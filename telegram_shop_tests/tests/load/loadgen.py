@@ -0,0 +1,183 @@
+"""
+Генератор нагрузки: конкурентные виртуальные покупатели, проходящие сценарии.
+
+Каждый пользователь стартует в пределах окна разгона (ramp_up), выбирает
+сценарий по весу, проходит его шаги с паузами на «раздумье» (think_time)
+и повторяет, пока не истечёт duration или число итераций. Для каждого
+шага собираются задержки (p50/p95/p99), для всего прогона — пропускная
+способность и лаг цикла событий.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LatencyStats:
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            'count': len(ordered),
+            'errors': self.errors,
+            'p50': percentile(ordered, 0.50),
+            'p95': percentile(ordered, 0.95),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1] if ordered else 0.0,
+        }
+
+
+class LoopLagMonitor:
+    """Измеряет, насколько позже запланированного просыпается цикл событий."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.stats = LatencyStats()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.stats.add(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class UserSession:
+    """Контекст одного виртуального пользователя, передаётся в сценарий."""
+
+    def __init__(self, generator, user_index, rnd):
+        self.generator = generator
+        self.user_index = user_index
+        self.random = rnd
+        self.state = {}
+
+    @asynccontextmanager
+    async def step(self, name):
+        stats = self.generator.step_stats(name)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.add(time.perf_counter() - started)
+
+    async def think(self):
+        think_time = self.generator.think_time
+        if think_time > 0:
+            await asyncio.sleep(self.random.uniform(0.5 * think_time, 1.5 * think_time))
+
+
+class LoadGenerator:
+    def __init__(self, journeys, users=100, ramp_up=0.0, think_time=0.0,
+                 iterations=1, duration=None, seed=0):
+        """journeys: {название: (вес, async fn(session))}."""
+        self.journeys = journeys
+        self.users = users
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.iterations = iterations
+        self.duration = duration
+        self.seed = seed
+        self._steps = {}
+        self._journey_stats = {}
+
+    def step_stats(self, name):
+        return self._steps.setdefault(name, LatencyStats())
+
+    def _pick_journey(self, rnd):
+        names = list(self.journeys)
+        weights = [self.journeys[name][0] for name in names]
+        return rnd.choices(names, weights=weights)[0]
+
+    async def _run_user(self, user_index, deadline):
+        rnd = random.Random(self.seed * 1_000_003 + user_index)
+        if self.ramp_up > 0 and self.users > 1:
+            await asyncio.sleep(self.ramp_up * user_index / (self.users - 1))
+        session = UserSession(self, user_index, rnd)
+        done = 0
+        while True:
+            if deadline is None and done >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            name = self._pick_journey(rnd)
+            stats = self._journey_stats.setdefault(name, LatencyStats())
+            started = time.perf_counter()
+            try:
+                await self.journeys[name][1](session)
+            except Exception:
+                stats.errors += 1
+            else:
+                stats.add(time.perf_counter() - started)
+            done += 1
+
+    async def run(self):
+        monitor = LoopLagMonitor()
+        monitor.start()
+        started = time.perf_counter()
+        deadline = started + self.duration if self.duration is not None else None
+        try:
+            await asyncio.gather(*[self._run_user(i, deadline) for i in range(self.users)])
+        finally:
+            await monitor.stop()
+        elapsed = time.perf_counter() - started
+        journeys = {name: stats.summary() for name, stats in sorted(self._journey_stats.items())}
+        steps = {name: stats.summary() for name, stats in sorted(self._steps.items())}
+        completed = sum(j['count'] for j in journeys.values())
+        return {
+            'users': self.users,
+            'elapsed': elapsed,
+            'journeys_per_sec': completed / elapsed if elapsed > 0 else 0.0,
+            'steps_per_sec': sum(s['count'] for s in steps.values()) / elapsed if elapsed > 0 else 0.0,
+            'journeys': journeys,
+            'steps': steps,
+            'loop_lag': monitor.stats.summary(),
+        }
+
+
+def format_report(report):
+    lines = [
+        f"users: {report['users']}, elapsed: {report['elapsed']:.2f} s",
+        f"throughput: {report['journeys_per_sec']:.1f} journeys/s, {report['steps_per_sec']:.1f} steps/s",
+        "",
+        f"{'step':<32} {'count':>7} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+    ]
+    for title, rows in (('journey', report['journeys']), ('step', report['steps'])):
+        for name, s in rows.items():
+            lines.append(
+                f"{title + ':' + name:<32} {s['count']:>7} {s['errors']:>5} "
+                f"{s['p50'] * 1000:>8.2f} {s['p95'] * 1000:>8.2f} {s['p99'] * 1000:>8.2f}"
+            )
+    lag = report['loop_lag']
+    lines.append("")
+    lines.append(f"event loop lag: p50 {lag['p50'] * 1000:.2f} ms, p99 {lag['p99'] * 1000:.2f} ms, "
+                 f"max {lag['max'] * 1000:.2f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,15 @@
+"""
+Денежные суммы в копейках для бэкендов, хранящих их целыми числами
+(SQLite-бэкенд, снимок каталога).
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+
+def to_kopecks(amount):
+    """Сумма в копейках; доли копейки округляются по правилам коммерческого округления."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_kopecks(value):
+    return Decimal(value) / 100
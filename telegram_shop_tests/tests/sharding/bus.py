@@ -0,0 +1,256 @@
+"""
+Шина инвалидации кэшей между процессами поверх Unix domain socket.
+
+Брокер нумерует события (seq) и хранит последние retain штук. Подписчик
+при переподключении сообщает epoch брокера и последний обработанный seq:
+пропущенные события досылаются повторно (доставка at-least-once, поэтому
+обработчики должны быть идемпотентны). Если брокер перезапускался
+(другой epoch) или нужные события уже вытеснены из журнала, подписчик
+получает reset и сбрасывает кэши целиком. Первым ответом на подписку
+брокер всегда присылает welcome (текущая позиция) или reset. Ошибка
+обработчика или повреждённая строка логируются и подписку не обрывают;
+повреждённый запрос брокер так же пропускает, не закрывая соединение.
+Подписчика, который не успевает читать (буфер записи больше max_buffer),
+брокер отключает; переподключившись, он получает пропущенное из журнала
+или reset. Событие длиннее limit подписчик прочитать не может и
+переподписывается с last_seq = -1, на что брокер всегда отвечает reset.
+
+Протокол — JSON по строке на сообщение:
+    {"op": "publish", "event": {"type": "product_changed", "product_id": 3}}
+    {"op": "publish", "event": {"type": "favorites_changed", "user_id": 42}}
+    {"op": "subscribe", "epoch": "...", "last_seq": 41}
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CHANGED = 'product_changed'
+CATEGORY_CHANGED = 'category_changed'
+PROMO_CHANGED = 'promo_changed'
+FAVORITES_CHANGED = 'favorites_changed'
+CATALOG_VERSION = 'catalog_version'
+RESET = 'reset'
+WELCOME = 'welcome'
+
+# сколько байт может скопиться в буфере записи подписчика, прежде чем брокер его отключит
+MAX_SUBSCRIBER_BUFFER = 1 << 20
+# предел длины одной строки протокола
+MAX_MESSAGE = 1 << 20
+
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode() + b'\n'
+
+
+def decode_event(line):
+    """Разбирает событие от брокера; None — строка повреждена."""
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or not {'type', 'epoch', 'seq'} <= event.keys():
+        return None
+    return event
+
+
+def decode_request(line):
+    """Разбирает запрос к брокеру; None — строка повреждена или запрос неизвестен."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(message, dict):
+        return None
+    if message.get('op') == 'publish':
+        return message if isinstance(message.get('event'), dict) and 'type' in message['event'] else None
+    if message.get('op') == 'subscribe':
+        return message if isinstance(message.get('last_seq', 0), int) else None
+    return None
+
+
+class InvalidationBroker:
+    def __init__(self, path, retain=10_000, max_buffer=MAX_SUBSCRIBER_BUFFER):
+        self.path = path
+        self.max_buffer = max_buffer
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self._log = deque(maxlen=retain)
+        self._subscribers = set()
+        self._connections = set()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path, limit=MAX_MESSAGE)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self.start()
+        await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            async for line in reader:
+                message = decode_request(line)
+                if message is None:
+                    logger.warning("skipping malformed bus request: %r", line)
+                    continue
+                if message['op'] == 'publish':
+                    event = self.publish(message['event'])
+                    writer.write(encode({'type': 'ack', 'seq': event['seq']}))
+                    await writer.drain()
+                elif message['op'] == 'subscribe':
+                    self._subscribe(writer, message.get('epoch'), message.get('last_seq', 0))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError:
+            logger.warning("closing bus connection: request longer than %d bytes", MAX_MESSAGE)
+        finally:
+            self._subscribers.discard(writer)
+            self._connections.discard(writer)
+            writer.close()
+
+    def publish(self, event):
+        self.seq += 1
+        event = {**event, 'seq': self.seq, 'epoch': self.epoch}
+        self._log.append(event)
+        data = encode(event)
+        for writer in list(self._subscribers):
+            if writer.is_closing():
+                self._subscribers.discard(writer)
+            elif writer.transport.get_write_buffer_size() > self.max_buffer:
+                logger.warning("dropping bus subscriber with %d bytes unsent", writer.transport.get_write_buffer_size())
+                self._subscribers.discard(writer)
+                writer.transport.abort()
+            else:
+                writer.write(data)
+        return event
+
+    def _subscribe(self, writer, epoch, last_seq):
+        first_retained = self._log[0]['seq'] if self._log else self.seq + 1
+        if epoch is None:
+            writer.write(encode({'type': WELCOME, 'seq': self.seq, 'epoch': self.epoch}))
+        elif epoch != self.epoch or last_seq + 1 < first_retained:
+            writer.write(encode({'type': RESET, 'seq': self.seq, 'epoch': self.epoch}))
+        else:
+            writer.write(encode({'type': WELCOME, 'seq': last_seq, 'epoch': self.epoch}))
+            for event in self._log:
+                if event['seq'] > last_seq:
+                    writer.write(encode(event))
+        self._subscribers.add(writer)
+
+
+def run_broker(path, retain=10_000):
+    """Точка входа процесса брокера."""
+    asyncio.run(InvalidationBroker(path, retain).serve_forever())
+
+
+class BusClient:
+    """Публикация событий и подписка с автоматическим переподключением."""
+
+    def __init__(self, path, reconnect_delay=0.1, limit=MAX_MESSAGE):
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.limit = limit
+        self.epoch = None
+        self.last_seq = 0
+        self.connected = asyncio.Event()
+        self._handlers = {}
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._task = None
+
+    def on(self, kind, callback):
+        """Регистрирует обработчик события kind (или RESET); callback может быть корутинной функцией."""
+        self._handlers.setdefault(kind, []).append(callback)
+
+    async def publish(self, kind, **payload):
+        async with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = await asyncio.open_unix_connection(self.path, limit=self.limit)
+                    reader, writer = self._publisher
+                    writer.write(encode({'op': 'publish', 'event': {'type': kind, **payload}}))
+                    await writer.drain()
+                    line = await reader.readline()
+                    if not line:
+                        raise ConnectionResetError("broker closed the connection")
+                    return json.loads(line)['seq']
+                except (ConnectionError, FileNotFoundError):
+                    self._close_publisher()
+                    if attempt:
+                        raise
+
+    def _close_publisher(self):
+        if self._publisher is not None:
+            self._publisher[1].close()
+            self._publisher = None
+
+    async def _dispatch(self, event):
+        for callback in self._handlers.get(event['type'], ()):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("bus handler %r failed on %s event", callback, event['type'])
+        self.epoch = event['epoch']
+        self.last_seq = event['seq']
+        if event['type'] in (WELCOME, RESET):
+            self.connected.set()
+
+    async def run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.limit)
+            except (ConnectionError, FileNotFoundError):
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            try:
+                writer.write(encode({'op': 'subscribe', 'epoch': self.epoch, 'last_seq': self.last_seq}))
+                await writer.drain()
+                async for line in reader:
+                    event = decode_event(line)
+                    if event is None:
+                        logger.warning("skipping malformed bus message: %r", line)
+                        continue
+                    await self._dispatch(event)
+            except ConnectionError:
+                pass
+            except ValueError:
+                # событие длиннее limit потеряно — кэши нужно сбросить целиком
+                logger.warning("bus event longer than %d bytes, resubscribing for reset", self.limit)
+                self.last_seq = -1
+            finally:
+                self.connected.clear()
+                writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+        return self
+
+    async def stop(self):
+        self._close_publisher()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,80 @@
+"""
+Запись и воспроизведение потока апдейтов для шардированных воркеров.
+
+Записанный поток — JSONL, по апдейту на строку: пользователь добавляет
+товары в корзину и оформляет заказ каждым третьим апдейтом. Обработчик
+shop_handler держит корзины в памяти своего воркера (CartService поверх
+InMemoryBackend), а остатки и использование промокода списывает в общем
+SQLite-хранилище. Промокод одноразовый: первый заказ пользователя
+возвращает 'ordered', следующие оформляются без скидки ('ordered_full_price').
+"""
+
+import json
+import random
+
+from tests.inmemory import InMemoryBackend
+
+CATALOG_PRODUCTS = 1000
+CHECKOUT_EVERY = 3
+PROMO_CODE = "SAVE10"
+
+
+def record_updates(path, count, users, products=CATALOG_PRODUCTS, seed=0):
+    rnd = random.Random(seed)
+    sequence = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        for update_id in range(1, count + 1):
+            user_id = rnd.randrange(1, users + 1)
+            seq = sequence[user_id] = sequence.get(user_id, 0) + 1
+            update = {
+                'update_id': update_id,
+                'user_id': user_id,
+                'seq': seq,
+                'action': 'checkout' if seq % CHECKOUT_EVERY == 0 else 'add',
+                'product_id': rnd.randrange(1, products + 1),
+            }
+            f.write(json.dumps(update) + '\n')
+    return path
+
+
+def load_updates(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(supervisor, updates, timeout=300):
+    for update in updates:
+        supervisor.dispatch(update)
+    supervisor.wait_idle(timeout)
+
+
+def _cart_service(context):
+    service = context.state.get('cart_service')
+    if service is None:
+        from app.services.cart_service import CartService
+        backend = InMemoryBackend.generate(products=CATALOG_PRODUCTS, categories=10, users=0)
+        for product in backend.product_repo.product_records():
+            product.stock = 10 ** 9
+        service = context.state['cart_service'] = CartService(
+            cart_repo=backend.cart_repo, product_repo=backend.product_repo
+        )
+    return service
+
+
+async def shop_handler(update, context):
+    cart_service = _cart_service(context)
+    user_id = update['user_id']
+    if update['action'] == 'add':
+        await cart_service.add_item(user_id=user_id, product_id=update['product_id'], qty=1)
+        return 'added'
+    cart = await cart_service.get_cart(user_id)
+    reserved = []
+    for item in cart.items:
+        if not await context.store.product_repo.reserve_stock(item.product_id, item.qty):
+            for product_id, qty in reserved:
+                await context.store.product_repo.release_stock(product_id, qty)
+            return 'out_of_stock'
+        reserved.append((item.product_id, item.qty))
+    promo_applied = await context.store.promocode_repo.claim_usage(PROMO_CODE, user_id, update['update_id'])
+    await cart_service.clear_cart(user_id)
+    return 'ordered' if promo_applied else 'ordered_full_price'
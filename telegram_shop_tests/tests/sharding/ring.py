@@ -0,0 +1,44 @@
+"""
+Консистентное хеширование user_id по воркерам.
+
+Каждый воркер занимает replicas виртуальных точек на кольце; при
+добавлении или удалении воркера переезжает только ~1/N пользователей.
+"""
+
+import bisect
+import hashlib
+
+
+def ring_hash(value):
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    def __init__(self, nodes=(), replicas=64):
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        return sorted(set(self._owners))
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            point = ring_hash(f"{node}#{replica}")
+            index = bisect.bisect_left(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key):
+        if not self._points:
+            raise LookupError("hash ring is empty")
+        index = bisect.bisect_right(self._points, ring_hash(key))
+        return self._owners[index % len(self._owners)]
@@ -0,0 +1,306 @@
+"""
+Супервизор воркер-процессов с маршрутизацией апдейтов по user_id.
+
+Апдейты одного пользователя всегда попадают в один воркер (консистентный
+хеш по кольцу), а воркер обрабатывает свою очередь строго по порядку,
+поэтому операции с корзиной и заказами пользователя не переупорядочиваются.
+Общее для всех пользователей состояние (остатки, использование
+промокодов) живёт в общем SQLite-файле (SQLiteBackend, режим WAL), который
+каждый воркер открывает сам.
+
+Остановка воркера идёт вне очереди (multiprocessing.Event): процесс
+дорабатывает текущий апдейт и выходит, не забирая следующих. Поэтому
+перезапуск сохраняет очередь — новый процесс продолжает с того же места,
+а пользователи не переезжают. Упавший воркер поднимается так же;
+апдейт, на котором он упал, не повторяется (обработчик мог успеть
+частично его применить) и засчитывается в errors. Результаты воркер
+пишет в свой канал (Pipe) синхронно, поэтому всё, что он успел
+отправить до падения, супервизор дочитывает до признака конца канала.
+При изменении числа воркеров (resize) супервизор дожидается барьера во
+всех очередях и только потом переключает кольцо — переехавшие
+пользователи не обгоняют свои же необработанные апдейты.
+
+С bus_path супервизор поднимает процесс брокера шины инвалидации
+(tests.sharding.bus), а каждый воркер подписывается на неё до того, как
+сообщить о готовности; on_start воркера регистрирует обработчики событий.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import queue
+import os
+import time
+
+from tests.sharding.bus import BusClient, run_broker
+from tests.sharding.ring import HashRing
+
+UPDATE = 'update'
+BARRIER = 'barrier'
+READY = 'ready'
+DONE = 'done'
+ERROR = 'error'
+
+# как часто простаивающий воркер проверяет флаг остановки
+STOP_POLL_INTERVAL = 0.05
+
+
+class WorkerContext:
+    """Состояние воркера, передаётся в обработчик вместе с апдейтом."""
+
+    def __init__(self, worker_id, store, bus=None):
+        self.worker_id = worker_id
+        self.store = store
+        self.bus = bus
+        self.state = {}
+
+
+def _next_message(inbox, stop):
+    while not stop.is_set():
+        try:
+            return inbox.get(timeout=STOP_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return None
+
+
+async def _worker_loop(worker_id, handler, inbox, stop, current, results, store_path, bus_path, on_start):
+    store = None
+    if store_path is not None:
+        from tests.sqlite_backend import SQLiteBackend
+        store = SQLiteBackend(store_path, pool_size=1)
+    bus = BusClient(bus_path) if bus_path is not None else None
+    context = WorkerContext(worker_id, store, bus)
+    if on_start is not None:
+        await on_start(context)
+    if bus is not None:
+        bus.start()
+        await bus.connected.wait()
+    loop = asyncio.get_running_loop()
+    results.send((READY, worker_id, None, None))
+    try:
+        while True:
+            message = await loop.run_in_executor(None, _next_message, inbox, stop)
+            if message is None:
+                break
+            kind, payload = message
+            if kind == BARRIER:
+                results.send((BARRIER, worker_id, payload, None))
+                continue
+            seq, update = payload
+            current.value = seq
+            try:
+                result = await handler(update, context)
+            except Exception as e:
+                results.send((ERROR, worker_id, seq, repr(e)))
+            else:
+                results.send((DONE, worker_id, seq, result))
+            current.value = 0
+    finally:
+        if bus is not None:
+            await bus.stop()
+        if store is not None:
+            store.close()
+
+
+def worker_main(worker_id, handler, inbox, stop, current, results, store_path, bus_path=None, on_start=None):
+    asyncio.run(_worker_loop(worker_id, handler, inbox, stop, current, results, store_path, bus_path, on_start))
+
+
+class Supervisor:
+    def __init__(self, handler, workers=4, store_path=None, replicas=64, start_method=None, max_restarts=10,
+                 bus_path=None, on_start=None):
+        """handler: async fn(update, context), on_start: async fn(context) — уровня модуля."""
+        self.handler = handler
+        self.store_path = store_path
+        self.bus_path = bus_path
+        self.on_start = on_start
+        self._broker = None
+        self._mp = multiprocessing.get_context(start_method)
+        self._ring = HashRing([self._worker_name(i) for i in range(workers)], replicas=replicas)
+        self._inboxes = {}
+        self._processes = {}
+        self._stop_events = {}
+        self._readers = {}
+        # канал -> (воркер, процесс, номер апдейта в обработке: 0 — простаивает)
+        self._channels = {}
+        self._outstanding = {}
+        self._seqs = itertools.count(1)
+        self._barriers = itertools.count()
+        self.dispatched = 0
+        self.processed = 0
+        self.restarts = 0
+        self.max_restarts = max_restarts
+        self.results = {}
+        self.errors = {}
+
+    @staticmethod
+    def _worker_name(index):
+        return f"worker-{index}"
+
+    @property
+    def workers(self):
+        return self._ring.nodes
+
+    def worker_for(self, user_id):
+        return self._ring.node_for(user_id)
+
+    def start(self):
+        if self.bus_path is not None:
+            self._start_broker()
+        for worker_id in self._ring.nodes:
+            self._spawn(worker_id)
+        self._wait_ready(self._ring.nodes)
+        return self
+
+    def _start_broker(self, timeout=10):
+        if os.path.exists(self.bus_path):
+            os.unlink(self.bus_path)
+        self._broker = self._mp.Process(target=run_broker, args=(self.bus_path,), name="bus-broker", daemon=True)
+        self._broker.start()
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(self.bus_path):
+            if time.monotonic() > deadline or not self._broker.is_alive():
+                raise RuntimeError("invalidation bus broker did not start")
+            time.sleep(0.01)
+
+    def _spawn(self, worker_id):
+        inbox = self._inboxes.setdefault(worker_id, self._mp.Queue())
+        stop = self._stop_events[worker_id] = self._mp.Event()
+        current = self._mp.Value('q', 0, lock=False)
+        reader, writer = self._mp.Pipe(duplex=False)
+        process = self._mp.Process(
+            target=worker_main, name=worker_id, daemon=True,
+            args=(worker_id, self.handler, inbox, stop, current, writer, self.store_path, self.bus_path,
+                  self.on_start)
+        )
+        process.start()
+        # конец канала закрывается у супервизора, чтобы выход воркера давал EOFError
+        writer.close()
+        self._processes[worker_id] = process
+        self._readers[worker_id] = reader
+        self._channels[reader] = (worker_id, process, current)
+
+    def dispatch(self, update):
+        self.dispatched += 1
+        seq = next(self._seqs)
+        self._outstanding[seq] = update
+        self._inboxes[self.worker_for(update['user_id'])].put((UPDATE, (seq, update)))
+
+    def _handle_result(self, message):
+        kind, worker_id, key, value = message
+        if kind in (DONE, ERROR):
+            self.processed += 1
+            update_id = self._outstanding.pop(key).get('update_id')
+            if kind == DONE:
+                self.results[update_id] = (worker_id, value)
+            else:
+                self.errors[update_id] = (worker_id, value)
+        return kind, worker_id, key
+
+    def _worker_exited(self, reader):
+        """Канал дочитан до конца: апдейт, на котором умер процесс, засчитывается как ошибка."""
+        worker_id, process, current = self._channels.pop(reader)
+        reader.close()
+        process.join()
+        update = self._outstanding.pop(current.value, None)
+        if update is not None:
+            self.processed += 1
+            self.errors[update.get('update_id')] = (worker_id, f"worker exited with code {process.exitcode}")
+        if self._processes.get(worker_id) is process:
+            if self.restarts >= self.max_restarts:
+                raise RuntimeError(f"{worker_id} exited with code {process.exitcode}, restart limit reached")
+            self.restarts += 1
+            self._spawn(worker_id)
+
+    def _collect(self, done, timeout):
+        deadline = time.monotonic() + timeout
+        while not done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("workers did not respond in time")
+            for reader in multiprocessing.connection.wait(list(self._channels), timeout=min(remaining, 0.5)):
+                try:
+                    message = reader.recv()
+                except EOFError:
+                    self._worker_exited(reader)
+                    continue
+                yield self._handle_result(message)
+
+    def _wait_ready(self, worker_ids, timeout=30):
+        pending = set(worker_ids)
+        for kind, worker_id, _ in self._collect(lambda: not pending, timeout):
+            if kind == READY:
+                pending.discard(worker_id)
+
+    def wait_idle(self, timeout=60):
+        """Ждёт, пока все отправленные апдейты будут обработаны."""
+        for _ in self._collect(lambda: self.processed >= self.dispatched, timeout):
+            pass
+
+    def barrier(self, timeout=60):
+        """Ждёт, пока каждый воркер обработает всё, что было в его очереди на момент вызова."""
+        token = next(self._barriers)
+        pending = set(self._processes)
+        for worker_id in pending:
+            self._inboxes[worker_id].put((BARRIER, token))
+        for kind, worker_id, key in self._collect(lambda: not pending, timeout):
+            if kind == BARRIER and key == token:
+                pending.discard(worker_id)
+
+    def _stop_worker(self, worker_id, timeout=30):
+        """Останавливает процесс после текущего апдейта; необработанные апдейты остаются в очереди.
+
+        terminate — только для зависшего обработчика: между апдейтами
+        воркер выходит сам и не держит блокировку очереди.
+        """
+        process = self._processes.pop(worker_id)
+        reader = self._readers.pop(worker_id)
+        self._stop_events.pop(worker_id).set()
+        try:
+            for _ in self._collect(lambda: reader not in self._channels, timeout):
+                pass
+        except TimeoutError:
+            process.terminate()
+            for _ in self._collect(lambda: reader not in self._channels, timeout):
+                pass
+
+    def restart_worker(self, worker_id, timeout=30):
+        """Плавный перезапуск: старый процесс дорабатывает текущий апдейт, новый продолжает с той же очереди."""
+        self._stop_worker(worker_id, timeout)
+        self.restarts += 1
+        self._spawn(worker_id)
+        self._wait_ready([worker_id], timeout)
+
+    def resize(self, workers, timeout=60):
+        """Меняет число воркеров; пользователи переезжают только после барьера."""
+        self.barrier(timeout)
+        current = set(self._ring.nodes)
+        target = {self._worker_name(i) for i in range(workers)}
+        for worker_id in sorted(current - target):
+            self._ring.remove(worker_id)
+            self._stop_worker(worker_id, timeout)
+            del self._inboxes[worker_id]
+        added = sorted(target - current)
+        for worker_id in added:
+            self._ring.add(worker_id)
+            self._spawn(worker_id)
+        self._wait_ready(added, timeout)
+
+    def stop(self, timeout=30):
+        """Останавливает воркеры и брокер; чтобы доработать очереди, сначала вызовите wait_idle."""
+        for worker_id in list(self._processes):
+            self._stop_worker(worker_id, timeout)
+        if self._broker is not None:
+            self._broker.terminate()
+            self._broker.join()
+            self._broker = None
+            if os.path.exists(self.bus_path):
+                os.unlink(self.bus_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
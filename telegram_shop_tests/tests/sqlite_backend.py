@@ -0,0 +1,723 @@
+"""
+SQLite-бэкенд репозиториев для локального запуска без сервера БД.
+
+Реализует те же контракты, что и tests/inmemory.py, поверх SQLite в режиме
+WAL: пул соединений, запросы к которым выполняются в потоках, кэш
+подготовленных выражений каждого соединения, покрывающие индексы под
+каждую выборку и пакетная запись через executemany в одной транзакции.
+Денежные суммы хранятся в копейках (INTEGER).
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+
+from tests.conftest import (
+    MockCategory, MockFavorite, MockOrder, MockOrderItem, MockPromocode
+)
+from tests.inmemory import ProductRecord, UserRecord
+from tests.money import from_kopecks, to_kopecks
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    sort_order INTEGER NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    stock INTEGER NOT NULL DEFAULT 0,
+    category_id INTEGER NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    description TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_category
+    ON products (category_id, is_active, id, name, price, stock, description, created_at);
+CREATE TABLE IF NOT EXISTS cart_items (
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    qty INTEGER NOT NULL,
+    PRIMARY KEY (user_id, product_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    telegram_id INTEGER NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    is_admin INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    order_number TEXT NOT NULL UNIQUE,
+    total INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    discount INTEGER NOT NULL DEFAULT 0,
+    contact_name TEXT NOT NULL DEFAULT '',
+    contact_phone TEXT NOT NULL DEFAULT '',
+    contact_address TEXT NOT NULL DEFAULT '',
+    payment_method TEXT NOT NULL DEFAULT 'card',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_orders_status_created ON orders (status, created_at);
+CREATE TABLE IF NOT EXISTS order_items (
+    id INTEGER PRIMARY KEY,
+    order_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    product_name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    qty INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_items_order
+    ON order_items (order_id, id, product_id, product_name, price, qty);
+CREATE TABLE IF NOT EXISTS favorites (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    UNIQUE (user_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS idx_favorites_user ON favorites (user_id, seq, product_id);
+CREATE TABLE IF NOT EXISTS promocodes (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    discount_type TEXT NOT NULL,
+    discount_value TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to TEXT NOT NULL,
+    is_used INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS promo_usage (
+    code TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    order_id INTEGER,
+    PRIMARY KEY (code, user_id)
+) WITHOUT ROWID;
+"""
+
+PRODUCT_COLUMNS = "id, name, price, stock, category_id, is_active, description, created_at"
+ORDER_COLUMNS = (
+    "id, user_id, order_number, total, status, discount, contact_name, contact_phone, "
+    "contact_address, payment_method, created_at"
+)
+ORDER_ITEM_COLUMNS = "id, order_id, product_id, product_name, price, qty"
+USER_COLUMNS = "id, telegram_id, name, phone, address, is_admin, created_at"
+
+PRODUCT_INSERT = f"INSERT OR REPLACE INTO products ({PRODUCT_COLUMNS}) VALUES ({', '.join('?' * 8)})"
+ORDER_INSERT = f"INSERT INTO orders ({ORDER_COLUMNS}) VALUES ({', '.join('?' * 11)})"
+ORDER_ITEM_INSERT = f"INSERT INTO order_items ({ORDER_ITEM_COLUMNS}) VALUES ({', '.join('?' * 6)})"
+USER_INSERT = f"INSERT OR REPLACE INTO users ({USER_COLUMNS}) VALUES ({', '.join('?' * 7)})"
+PROMOCODE_INSERT = (
+    "INSERT OR REPLACE INTO promocodes "
+    "(id, code, discount_type, discount_value, valid_from, valid_to, is_used) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# SQLite ограничивает число параметров в одном запросе
+MAX_VARIABLES = 900
+
+
+def to_iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def from_iso(value):
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def chunked(values, size=MAX_VARIABLES):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def placeholders(count):
+    return ", ".join("?" * count)
+
+
+def product_from_row(row):
+    return ProductRecord(
+        row[0], row[1], from_kopecks(row[2]), stock=row[3], category_id=row[4],
+        is_active=bool(row[5]), description=row[6], created_at=from_iso(row[7])
+    )
+
+
+def user_from_row(row):
+    return UserRecord(
+        row[0], row[1], row[2], row[3], row[4], is_admin=bool(row[5]), created_at=from_iso(row[6])
+    )
+
+
+def order_from_row(row):
+    order = MockOrder(
+        row[0], row[1], row[2], from_kopecks(row[3]), status=row[4], discount=from_kopecks(row[5]),
+        contact_name=row[6], contact_phone=row[7], contact_address=row[8], payment_method=row[9]
+    )
+    order.created_at = from_iso(row[10])
+    return order
+
+
+def order_item_from_row(row):
+    return MockOrderItem(row[0], row[1], row[2], row[3], from_kopecks(row[4]), row[5])
+
+
+def product_params(product):
+    return (
+        product.id, product.name, to_kopecks(product.price), product.stock, product.category_id,
+        int(product.is_active), getattr(product, 'description', ''), to_iso(product.created_at)
+    )
+
+
+def user_params(user):
+    return (
+        user.id, user.telegram_id, user.name, user.phone, user.address,
+        int(user.is_admin), to_iso(getattr(user, 'created_at', None))
+    )
+
+
+def order_params(order):
+    return (
+        order.id, order.user_id, order.order_number, to_kopecks(order.total), order.status,
+        to_kopecks(order.discount), order.contact_name, order.contact_phone,
+        order.contact_address, order.payment_method, to_iso(order.created_at)
+    )
+
+
+def order_item_params(item):
+    return (
+        item.id, item.order_id, item.product_id, item.product_name,
+        to_kopecks(item.price), item.qty
+    )
+
+
+def promocode_params(promocode):
+    return (
+        promocode.id, promocode.code.upper(), promocode.discount_type, str(promocode.discount_value),
+        to_iso(promocode.valid_from), to_iso(promocode.valid_to), int(promocode.is_used)
+    )
+
+
+def promocode_value(field, value):
+    if field == 'discount_value':
+        return str(value)
+    if field == 'is_used':
+        return int(value)
+    return to_iso(value)
+
+
+class ConnectionPool:
+    """Пул соединений SQLite; каждый запрос выполняется в отдельном потоке.
+
+    Очередь свободных соединений привязана к циклу событий: пул можно
+    использовать из нескольких циклов по очереди (например, из разных
+    asyncio.run), но не из двух циклов одновременно. Соединения, которые
+    не вернулись в пул прежнего цикла (его закрыли посреди запроса),
+    заменяются новыми и закрываются вместе с пулом.
+    """
+
+    def __init__(self, path, size=4, statement_cache_size=256):
+        self.path = path
+        self._statement_cache_size = statement_cache_size
+        self._connections = [self._connect(statement_cache_size) for _ in range(size)]
+        self._abandoned = []
+        self._idle = None
+        self._loop = None
+
+    def _connect(self, statement_cache_size):
+        conn = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False,
+            isolation_level=None, cached_statements=statement_cache_size
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _idle_queue(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._idle is not None:
+                self._replace_leaked()
+            self._loop = loop
+            self._idle = asyncio.Queue()
+            for conn in self._connections:
+                self._idle.put_nowait(conn)
+        return self._idle
+
+    def _replace_leaked(self):
+        idle = set()
+        while not self._idle.empty():
+            idle.add(self._idle.get_nowait())
+        for index, conn in enumerate(self._connections):
+            if conn not in idle:
+                self._abandoned.append(conn)
+                self._connections[index] = self._connect(self._statement_cache_size)
+
+    async def run(self, fn, *args):
+        idle = self._idle_queue()
+        conn = await idle.get()
+        try:
+            future = asyncio.ensure_future(asyncio.to_thread(fn, conn, *args))
+        except BaseException:
+            idle.put_nowait(conn)
+            raise
+
+        def release(future):
+            # при отмене ожидающей задачи поток дорабатывает с соединением,
+            # поэтому в пул оно возвращается только по завершении потока
+            if not future.cancelled():
+                future.exception()
+            idle.put_nowait(conn)
+
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+    async def fetchall(self, sql, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql, params=()):
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def execute(self, sql, params=()):
+        return await self.run(lambda conn: transaction(conn, lambda: conn.execute(sql, params).rowcount))
+
+    async def executemany(self, sql, rows):
+        return await self.run(lambda conn: transaction(conn, lambda: conn.executemany(sql, rows).rowcount))
+
+    def close(self):
+        for conn in self._connections + self._abandoned:
+            conn.close()
+        self._connections = []
+        self._abandoned = []
+
+
+def transaction(conn, fn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn()
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return result
+
+
+class SQLiteProductRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def fetch_categories(self):
+        rows = await self._pool.fetchall(
+            "SELECT id, name, sort_order, is_active FROM categories WHERE is_active = 1 ORDER BY sort_order"
+        )
+        return [MockCategory(*row[:3], is_active=bool(row[3])) for row in rows]
+
+    async def fetch_category_by_id(self, category_id):
+        row = await self._pool.fetchone(
+            "SELECT id, name, sort_order, is_active FROM categories WHERE id = ?", (category_id,)
+        )
+        return MockCategory(*row[:3], is_active=bool(row[3])) if row else None
+
+    async def fetch_category_by_name(self, name):
+        row = await self._pool.fetchone(
+            "SELECT id, name, sort_order, is_active FROM categories WHERE name = ?", (name,)
+        )
+        return MockCategory(*row[:3], is_active=bool(row[3])) if row else None
+
+    async def fetch_products_by_category(self, category_id):
+        rows = await self._pool.fetchall(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE category_id = ? AND is_active = 1 ORDER BY id",
+            (category_id,)
+        )
+        return [product_from_row(row) for row in rows]
+
+    async def fetch_product_by_id(self, product_id):
+        row = await self._pool.fetchone(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ? AND is_active = 1", (product_id,)
+        )
+        return product_from_row(row) if row else None
+
+    async def fetch_products_by_ids(self, product_ids):
+        ids = list(dict.fromkeys(product_ids))
+        found = {}
+        for chunk in chunked(ids):
+            rows = await self._pool.fetchall(
+                f"SELECT {PRODUCT_COLUMNS} FROM products WHERE is_active = 1 AND id IN ({placeholders(len(chunk))})",
+                chunk
+            )
+            found.update((row[0], product_from_row(row)) for row in rows)
+        return [found[product_id] for product_id in ids if product_id in found]
+
+    async def fetch_all_products(self):
+        rows = await self._pool.fetchall(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE is_active = 1 ORDER BY id"
+        )
+        return [product_from_row(row) for row in rows]
+
+    async def insert_product(self, data):
+        def insert(conn):
+            return transaction(conn, lambda: conn.execute(
+                "INSERT INTO products (name, price, stock, category_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                (data.name, to_kopecks(data.price), data.stock, data.category_id, to_iso(datetime.utcnow()))
+            ).lastrowid)
+
+        return await self.fetch_product_by_id(await self._pool.run(insert))
+
+    async def insert_products_batch(self, products):
+        return await self._pool.executemany(
+            PRODUCT_INSERT,
+            [product_params(p) for p in products]
+        )
+
+    async def update_product(self, product_id, data):
+        fields = []
+        params = []
+        for field in ('name', 'price', 'stock', 'category_id', 'description'):
+            value = getattr(data, field, None)
+            if value is not None:
+                fields.append(f"{field} = ?")
+                params.append(to_kopecks(value) if field == 'price' else value)
+        if fields:
+            await self._pool.execute(
+                f"UPDATE products SET {', '.join(fields)} WHERE id = ?", (*params, product_id)
+            )
+        row = await self._pool.fetchone(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = ?", (product_id,))
+        return product_from_row(row) if row else None
+
+    async def delete_product(self, product_id):
+        return await self._pool.execute("UPDATE products SET is_active = 0 WHERE id = ?", (product_id,)) > 0
+
+    async def reserve_stock(self, product_id, qty):
+        """Атомарно списывает остаток; False, если остатка не хватает."""
+        return await self._pool.execute(
+            "UPDATE products SET stock = stock - ? WHERE id = ? AND is_active = 1 AND stock >= ?",
+            (qty, product_id, qty)
+        ) > 0
+
+    async def release_stock(self, product_id, qty):
+        await self._pool.execute("UPDATE products SET stock = stock + ? WHERE id = ?", (qty, product_id))
+
+    async def insert_category(self, name):
+        def insert(conn):
+            return transaction(conn, lambda: conn.execute(
+                "INSERT INTO categories (name, sort_order) "
+                "VALUES (?, (SELECT COALESCE(MAX(id), 0) + 1 FROM categories))",
+                (name,)
+            ).lastrowid)
+
+        return await self.fetch_category_by_id(await self._pool.run(insert))
+
+    async def delete_category(self, category_id):
+        return await self._pool.execute("UPDATE categories SET is_active = 0 WHERE id = ?", (category_id,)) > 0
+
+    async def count_products_in_category(self, category_id):
+        row = await self._pool.fetchone(
+            "SELECT COUNT(*) FROM products WHERE category_id = ? AND is_active = 1", (category_id,)
+        )
+        return row[0]
+
+
+class SQLiteCartRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def get_cart_items(self, user_id):
+        rows = await self._pool.fetchall(
+            "SELECT c.product_id, c.qty, p.name, p.price, p.stock, p.is_active "
+            "FROM cart_items c JOIN products p ON p.id = c.product_id WHERE c.user_id = ?",
+            (user_id,)
+        )
+        return [{
+            'product_id': row[0], 'qty': row[1], 'name': row[2],
+            'price': from_kopecks(row[3]), 'stock': row[4], 'is_active': bool(row[5])
+        } for row in rows]
+
+    async def upsert_cart_item(self, user_id, product_id, qty):
+        await self.upsert_cart_items_batch([(user_id, product_id, qty)])
+
+    async def upsert_cart_items_batch(self, rows):
+        await self._pool.executemany(
+            "INSERT INTO cart_items (user_id, product_id, qty) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, product_id) DO UPDATE SET qty = excluded.qty",
+            rows
+        )
+
+    async def delete_cart_item(self, user_id, product_id):
+        await self._pool.execute(
+            "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?", (user_id, product_id)
+        )
+
+    async def clear_cart(self, user_id):
+        await self._pool.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,))
+
+
+class SQLiteOrderRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def insert_order(self, order, items=()):
+        def insert(conn):
+            def write():
+                conn.execute(ORDER_INSERT, order_params(order))
+                conn.executemany(ORDER_ITEM_INSERT, [order_item_params(item) for item in items])
+
+            transaction(conn, write)
+
+        await self._pool.run(insert)
+        return order
+
+    async def insert_orders_batch(self, orders):
+        await self._pool.executemany(ORDER_INSERT, [order_params(o) for o in orders])
+
+    async def get_order_by_id(self, order_id):
+        row = await self._pool.fetchone(f"SELECT {ORDER_COLUMNS} FROM orders WHERE id = ?", (order_id,))
+        return order_from_row(row) if row else None
+
+    async def get_orders_by_ids(self, order_ids):
+        ids = list(dict.fromkeys(order_ids))
+        found = {}
+        for chunk in chunked(ids):
+            rows = await self._pool.fetchall(
+                f"SELECT {ORDER_COLUMNS} FROM orders WHERE id IN ({placeholders(len(chunk))})", chunk
+            )
+            found.update((row[0], order_from_row(row)) for row in rows)
+        return [found[order_id] for order_id in ids if order_id in found]
+
+    async def list_orders_by_user(self, user_id):
+        rows = await self._pool.fetchall(
+            f"SELECT {ORDER_COLUMNS} FROM orders WHERE user_id = ? ORDER BY id", (user_id,)
+        )
+        return [order_from_row(row) for row in rows]
+
+    async def list_paid_orders(self, date_from, date_to):
+        rows = await self._pool.fetchall(
+            f"SELECT {ORDER_COLUMNS} FROM orders "
+            "WHERE status = 'paid' AND created_at >= ? AND created_at < ? ORDER BY created_at",
+            (to_iso(date_from), to_iso(date_to))
+        )
+        return [order_from_row(row) for row in rows]
+
+    async def update_order_status(self, order_id, status):
+        await self._pool.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+
+    async def get_order_items(self, order_id):
+        rows = await self._pool.fetchall(
+            f"SELECT {ORDER_ITEM_COLUMNS} FROM order_items WHERE order_id = ? ORDER BY id", (order_id,)
+        )
+        return [order_item_from_row(row) for row in rows]
+
+    async def get_order_items_batch(self, order_ids):
+        ids = list(order_ids)
+        result = {order_id: [] for order_id in ids}
+        for chunk in chunked(ids):
+            rows = await self._pool.fetchall(
+                f"SELECT {ORDER_ITEM_COLUMNS} FROM order_items "
+                f"WHERE order_id IN ({placeholders(len(chunk))}) ORDER BY order_id, id",
+                chunk
+            )
+            for row in rows:
+                result[row[1]].append(order_item_from_row(row))
+        return result
+
+
+class SQLiteUserRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def insert_users_batch(self, users):
+        await self._pool.executemany(USER_INSERT, [user_params(u) for u in users])
+
+    async def get_user_by_id(self, user_id):
+        row = await self._pool.fetchone(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
+        return user_from_row(row) if row else None
+
+    async def get_users_by_ids(self, user_ids):
+        ids = list(dict.fromkeys(user_ids))
+        found = {}
+        for chunk in chunked(ids):
+            rows = await self._pool.fetchall(
+                f"SELECT {USER_COLUMNS} FROM users WHERE id IN ({placeholders(len(chunk))})", chunk
+            )
+            found.update((row[0], user_from_row(row)) for row in rows)
+        return [found[user_id] for user_id in ids if user_id in found]
+
+    async def is_admin(self, user_id):
+        row = await self._pool.fetchone("SELECT is_admin FROM users WHERE id = ?", (user_id,))
+        return bool(row[0]) if row else False
+
+    async def update_user(self, user_id, data):
+        fields = []
+        params = []
+        for field in ('name', 'phone', 'address'):
+            value = getattr(data, field, None)
+            if value is not None:
+                fields.append(f"{field} = ?")
+                params.append(value)
+        if fields:
+            await self._pool.execute(f"UPDATE users SET {', '.join(fields)} WHERE id = ?", (*params, user_id))
+        return await self.get_user_by_id(user_id)
+
+    async def list_users_page(self, after_id=0, limit=100):
+        rows = await self._pool.fetchall(
+            f"SELECT {USER_COLUMNS} FROM users WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+        )
+        return [user_from_row(row) for row in rows]
+
+
+class SQLiteFavoritesRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def get_favorites(self, user_id):
+        rows = await self._pool.fetchall(
+            "SELECT seq, product_id FROM favorites WHERE user_id = ? ORDER BY seq", (user_id,)
+        )
+        return [MockFavorite(seq, user_id, product_id) for seq, product_id in rows]
+
+    async def add_favorite(self, user_id, product_id):
+        await self._pool.execute(
+            "INSERT OR IGNORE INTO favorites (user_id, product_id) VALUES (?, ?)", (user_id, product_id)
+        )
+
+    async def remove_favorite(self, user_id, product_id):
+        await self._pool.execute(
+            "DELETE FROM favorites WHERE user_id = ? AND product_id = ?", (user_id, product_id)
+        )
+
+    async def exists_favorite(self, user_id, product_id):
+        row = await self._pool.fetchone(
+            "SELECT 1 FROM favorites WHERE user_id = ? AND product_id = ?", (user_id, product_id)
+        )
+        return row is not None
+
+    async def exists_favorites(self, pairs):
+        pairs = [tuple(pair) for pair in pairs]
+        found = set()
+        for chunk in chunked(dict.fromkeys(pairs), MAX_VARIABLES // 2):
+            rows = await self._pool.fetchall(
+                "SELECT user_id, product_id FROM favorites "
+                f"WHERE (user_id, product_id) IN (VALUES {', '.join(['(?, ?)'] * len(chunk))})",
+                [value for pair in chunk for value in pair]
+            )
+            found.update(tuple(row) for row in rows)
+        return [pair in found for pair in pairs]
+
+    async def get_favorite_ids(self, user_id):
+        rows = await self._pool.fetchall("SELECT product_id FROM favorites WHERE user_id = ?", (user_id,))
+        return {row[0] for row in rows}
+
+    async def get_favorite_products(self, user_id, limit=None, offset=0):
+        rows = await self._pool.fetchall(
+            f"SELECT {', '.join('p.' + c for c in PRODUCT_COLUMNS.split(', '))} "
+            "FROM favorites f JOIN products p ON p.id = f.product_id "
+            "WHERE f.user_id = ? AND p.is_active = 1 ORDER BY f.seq LIMIT ? OFFSET ?",
+            (user_id, -1 if limit is None else limit, offset)
+        )
+        return [product_from_row(row) for row in rows]
+
+
+class SQLitePromocodeRepo:
+    def __init__(self, pool):
+        self._pool = pool
+
+    async def insert_promocodes_batch(self, promocodes):
+        await self._pool.executemany(PROMOCODE_INSERT, [promocode_params(p) for p in promocodes])
+
+    async def get_promocode_by_code(self, code):
+        row = await self._pool.fetchone(
+            "SELECT id, code, discount_type, discount_value, valid_from, valid_to, is_used "
+            "FROM promocodes WHERE code = ?",
+            (code.upper(),)
+        )
+        if row is None:
+            return None
+        return MockPromocode(
+            row[0], row[1], row[2], Decimal(row[3]), from_iso(row[4]), from_iso(row[5]), bool(row[6])
+        )
+
+    async def update_promocode(self, code, data):
+        fields = []
+        params = []
+        for field in ('discount_value', 'valid_to', 'is_used'):
+            value = getattr(data, field, None)
+            if value is not None:
+                fields.append(f"{field} = ?")
+                params.append(promocode_value(field, value))
+        if fields:
+            await self._pool.execute(
+                f"UPDATE promocodes SET {', '.join(fields)} WHERE code = ?", (*params, code.upper())
+            )
+        return await self.get_promocode_by_code(code)
+
+    async def check_user_usage(self, code, user_id):
+        row = await self._pool.fetchone(
+            "SELECT 1 FROM promo_usage WHERE code = ? AND user_id = ?", (code.upper(), user_id)
+        )
+        return row is not None
+
+    async def record_usage(self, code, user_id, order_id):
+        await self.record_usage_batch([(code, user_id, order_id)])
+
+    async def claim_usage(self, code, user_id, order_id):
+        """Записывает использование, только если его ещё нет; True — запись сделана этим вызовом."""
+        return await self._pool.execute(
+            "INSERT OR IGNORE INTO promo_usage (code, user_id, order_id) VALUES (?, ?, ?)",
+            (code.upper(), user_id, order_id)
+        ) > 0
+
+    async def list_usages(self):
+        return [tuple(row) for row in await self._pool.fetchall("SELECT code, user_id FROM promo_usage")]
+
+    async def record_usage_batch(self, records):
+        await self._pool.executemany(
+            "INSERT OR IGNORE INTO promo_usage (code, user_id, order_id) VALUES (?, ?, ?)",
+            [(code.upper(), user_id, order_id) for code, user_id, order_id in records]
+        )
+
+
+class SQLiteBackend:
+    """Набор SQLite-репозиториев над общим пулом соединений."""
+
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        self.pool = ConnectionPool(path, size=pool_size)
+        self.product_repo = SQLiteProductRepo(self.pool)
+        self.cart_repo = SQLiteCartRepo(self.pool)
+        self.order_repo = SQLiteOrderRepo(self.pool)
+        self.user_repo = SQLiteUserRepo(self.pool)
+        self.favorites_repo = SQLiteFavoritesRepo(self.pool)
+        self.promocode_repo = SQLitePromocodeRepo(self.pool)
+
+    def seed(self, categories=(), products=(), users=(), orders=(), promocodes=()):
+        """Синхронно загружает начальные данные одной транзакцией."""
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            def write():
+                conn.executemany(
+                    "INSERT OR REPLACE INTO categories (id, name, sort_order, is_active) VALUES (?, ?, ?, ?)",
+                    [(c.id, c.name, c.sort_order, int(c.is_active)) for c in categories]
+                )
+                conn.executemany(PRODUCT_INSERT, [product_params(p) for p in products])
+                conn.executemany(USER_INSERT, [user_params(u) for u in users])
+                conn.executemany(ORDER_INSERT, [order_params(o) for o in orders])
+                conn.executemany(PROMOCODE_INSERT, [promocode_params(p) for p in promocodes])
+
+            transaction(conn, write)
+        finally:
+            conn.close()
+        return self
+
+    def close(self):
+        self.pool.close()
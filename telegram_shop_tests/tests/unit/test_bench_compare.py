@@ -0,0 +1,67 @@
+"""
+Блочные тесты сравнения результатов бенчмарков (tests.benchmarks.compare).
+Тесты Б150-Б153.
+"""
+
+import json
+import pytest
+from tests.benchmarks.compare import compare, main
+from tests.benchmarks.recorder import BenchmarkRecorder
+
+
+def scenario(median):
+    return {'rounds': 5, 'min': median, 'median': median, 'mean': median, 'p95': median, 'ops_per_sec': 1 / median}
+
+
+def write_results(path, scenarios):
+    path.write_text(json.dumps({'scenarios': scenarios}))
+    return str(path)
+
+
+class TestBenchCompare:
+
+    def test_b150_compare_within_threshold(self):
+        """Б150: Рост медианы в пределах порога не считается регрессией"""
+        rows, regressions = compare({'search': scenario(0.010)}, {'search': scenario(0.0109)}, threshold=0.1)
+        
+        assert regressions == []
+        assert rows[0][-1] == 'ok'
+
+    def test_b151_compare_detects_regression(self):
+        """Б151: Рост медианы выше порога и пропавший сценарий — регрессии, новый сценарий — нет"""
+        baseline = {'search': scenario(0.010), 'removed': scenario(0.001)}
+        current = {'search': scenario(0.012), 'added': scenario(0.001)}
+        
+        rows, regressions = compare(baseline, current, threshold=0.1)
+        allowed_rows, allowed_regressions = compare(baseline, current, threshold=0.1, allow_missing=True)
+        
+        assert regressions == ['removed', 'search']
+        assert {row[0]: row[-1] for row in rows} == {'search': 'REGRESSION', 'removed': 'MISSING', 'added': 'new'}
+        assert allowed_regressions == ['search']
+        assert {row[0]: row[-1] for row in allowed_rows}['removed'] == 'missing'
+
+    def test_b152_compare_command_exit_code(self, tmp_path, capsys):
+        """Б152: Команда сравнения возвращает 1 при регрессии или пропавшем сценарии и 0 без них"""
+        baseline = write_results(tmp_path / "baseline.json", {'checkout': scenario(0.100), 'search': scenario(0.010)})
+        slower = write_results(tmp_path / "slower.json", {'checkout': scenario(0.150), 'search': scenario(0.010)})
+        faster = write_results(tmp_path / "faster.json", {'checkout': scenario(0.080), 'search': scenario(0.010)})
+        partial = write_results(tmp_path / "partial.json", {'checkout': scenario(0.080)})
+        
+        assert main([baseline, slower, '--threshold', '0.2']) == 1
+        assert main([baseline, faster]) == 0
+        assert "REGRESSION" in capsys.readouterr().out
+        assert main([baseline, partial]) == 1
+        assert "MISSING" in capsys.readouterr().out
+        assert main([baseline, partial, '--allow-missing']) == 0
+
+    @pytest.mark.asyncio
+    async def test_b153_recorder_dumps_json(self, tmp_path):
+        """Б153: Результаты замеров сохраняются в JSON, пригодный для сравнения"""
+        recorder = BenchmarkRecorder()
+        
+        await recorder.measure("noop", lambda: None, rounds=3, inner=10)
+        recorder.dump(str(tmp_path / "results.json"))
+        
+        saved = json.loads((tmp_path / "results.json").read_text())
+        assert saved['scenarios']['noop']['rounds'] == 3
+        assert main([str(tmp_path / "results.json"), str(tmp_path / "results.json")]) == 0
@@ -0,0 +1,87 @@
+"""
+Блочные тесты модуля рассылок (BroadcastService).
+Тесты Б117-Б120.
+"""
+
+import asyncio
+import pytest
+from app.services.broadcast_service import BroadcastService
+from app.services.send_scheduler import SendScheduler
+from tests.conftest import MockBot
+
+ALL_CHAT_IDS = {100001, 100002, 100003, 100004, 100008, 100009}
+
+
+class TestBroadcastService:
+
+    @pytest.fixture
+    def clocked_bot(self, mock_clock):
+        return MockBot(clock=mock_clock)
+
+    @pytest.fixture
+    def make_broadcast_service(self, clocked_bot, mock_user_repo, mock_clock, tmp_path):
+        """Новый экземпляр сервиса с тем же файлом контрольных точек — как после перезапуска бота."""
+        def make():
+            return BroadcastService(
+                bot=clocked_bot, user_repo=mock_user_repo,
+                scheduler=SendScheduler(bot=clocked_bot, clock=mock_clock),
+                checkpoint_file=str(tmp_path / "broadcast.json"), page_size=2, clock=mock_clock
+            )
+        return make
+
+    @pytest.fixture
+    def broadcast_service(self, make_broadcast_service):
+        return make_broadcast_service()
+
+    @pytest.mark.asyncio
+    async def test_b117_broadcast_all_users_paged(self, broadcast_service, clocked_bot, mock_user_repo):
+        """Б117: Рассылка получает пользователей постранично и отправляет сообщение каждому"""
+        report = await broadcast_service.broadcast("Новые поступления!")
+        
+        assert {msg['chat_id'] for msg in clocked_bot.sent_messages} == ALL_CHAT_IDS
+        assert report.sent == 6
+        assert mock_user_repo.list_users_page.await_count >= 3
+
+    @pytest.mark.asyncio
+    async def test_b118_broadcast_skips_blocked(self, broadcast_service, clocked_bot):
+        """Б118: Пользователи, заблокировавшие бота, пропускаются без остановки рассылки"""
+        clocked_bot.blocked_chats.add(100002)
+        
+        report = await broadcast_service.broadcast("Новые поступления!")
+        
+        assert report.sent == 5
+        assert report.blocked == 1
+        assert 100002 not in {msg['chat_id'] for msg in clocked_bot.sent_messages}
+
+    @pytest.mark.asyncio
+    async def test_b119_broadcast_resumes_from_checkpoint(self, make_broadcast_service, broadcast_service, clocked_bot):
+        """Б119: После прерывания рассылка продолжается с контрольной точки без повторов"""
+        send_message = clocked_bot.send_message
+        
+        async def interrupted_send(chat_id, text, **kwargs):
+            if len(clocked_bot.sent_messages) == 3:
+                raise asyncio.CancelledError()
+            return await send_message(chat_id, text, **kwargs)
+        
+        clocked_bot.send_message = interrupted_send
+        with pytest.raises(asyncio.CancelledError):
+            await broadcast_service.broadcast("Новые поступления!", broadcast_id="promo-1")
+        
+        clocked_bot.send_message = send_message
+        report = await make_broadcast_service().broadcast("Новые поступления!", broadcast_id="promo-1")
+        
+        chat_ids = [msg['chat_id'] for msg in clocked_bot.sent_messages]
+        assert sorted(chat_ids) == sorted(ALL_CHAT_IDS)
+        assert report.sent == 3
+
+    @pytest.mark.asyncio
+    async def test_b120_broadcast_reports_throughput_and_eta(self, broadcast_service):
+        """Б120: Прогресс рассылки содержит скорость отправки и оценку оставшегося времени"""
+        progress = []
+        
+        report = await broadcast_service.broadcast("Новые поступления!", on_progress=progress.append)
+        
+        assert len(progress) > 0
+        assert all(p.eta_seconds is not None for p in progress)
+        assert progress[-1].eta_seconds == 0
+        assert report.messages_per_sec > 0
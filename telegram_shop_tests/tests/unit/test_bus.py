@@ -0,0 +1,242 @@
+"""
+Блочные тесты шины инвалидации кэшей (tests.sharding.bus).
+Тесты Б164-Б168, Б179, Б187-Б189.
+"""
+
+import asyncio
+import json
+import pytest
+from tests.sharding.bus import (
+    BusClient, InvalidationBroker, PRODUCT_CHANGED, PROMO_CHANGED, CATALOG_VERSION, RESET, encode
+)
+from tests.sharding.supervisor import Supervisor
+
+
+async def wait_for(condition, timeout=5):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def subscribe_cache(context):
+    context.state['seen'] = []
+    context.bus.on(PRODUCT_CHANGED, lambda event: context.state['seen'].append(event['product_id']))
+
+
+async def bus_handler(update, context):
+    if update['action'] == 'publish':
+        await context.bus.publish(PRODUCT_CHANGED, product_id=update['product_id'])
+    return list(context.state['seen'])
+
+
+class TestInvalidationBus:
+
+    @pytest.fixture
+    def socket_path(self, tmp_path):
+        return str(tmp_path / "bus.sock")
+
+    @pytest.fixture
+    async def broker(self, socket_path):
+        broker = await InvalidationBroker(socket_path, retain=5).start()
+        yield broker
+        await broker.close()
+
+    async def subscriber(self, socket_path, kinds=(PRODUCT_CHANGED, PROMO_CHANGED, CATALOG_VERSION, RESET)):
+        client = BusClient(socket_path, reconnect_delay=0.01)
+        received = []
+        for kind in kinds:
+            client.on(kind, lambda event: received.append((event['type'], event['seq'])))
+        client.start()
+        await asyncio.wait_for(client.connected.wait(), 5)
+        return client, received
+
+    @pytest.mark.asyncio
+    async def test_b164_events_fan_out_in_order(self, broker, socket_path):
+        """Б164: События одного издателя приходят всем подписчикам в порядке seq"""
+        first, first_received = await self.subscriber(socket_path)
+        second, second_received = await self.subscriber(socket_path)
+        publisher = BusClient(socket_path)
+        
+        seqs = [
+            await publisher.publish(PRODUCT_CHANGED, product_id=3),
+            await publisher.publish(PROMO_CHANGED, code="SAVE10"),
+            await publisher.publish(CATALOG_VERSION, version=2),
+        ]
+        await wait_for(lambda: len(first_received) == 3 and len(second_received) == 3)
+        
+        assert seqs == [1, 2, 3]
+        assert first_received == second_received == [
+            (PRODUCT_CHANGED, 1), (PROMO_CHANGED, 2), (CATALOG_VERSION, 3)
+        ]
+        for client in (first, second, publisher):
+            await client.stop()
+
+    @pytest.mark.asyncio
+    async def test_b165_reconnect_replays_missed_events(self, broker, socket_path):
+        """Б165: После переподключения подписчик получает события, пропущенные за время разрыва"""
+        client, received = await self.subscriber(socket_path)
+        publisher = BusClient(socket_path)
+        await publisher.publish(PRODUCT_CHANGED, product_id=1)
+        await wait_for(lambda: len(received) == 1)
+        
+        await client.stop()
+        await publisher.publish(PRODUCT_CHANGED, product_id=2)
+        await publisher.publish(PRODUCT_CHANGED, product_id=3)
+        client.start()
+        await wait_for(lambda: len(received) == 3)
+        
+        assert received == [(PRODUCT_CHANGED, 1), (PRODUCT_CHANGED, 2), (PRODUCT_CHANGED, 3)]
+        assert client.last_seq == 3
+        await client.stop()
+        await publisher.stop()
+
+    @pytest.mark.asyncio
+    async def test_b166_reset_when_events_evicted(self, broker, socket_path):
+        """Б166: Если пропущенные события вытеснены из журнала брокера, подписчик получает reset"""
+        client, received = await self.subscriber(socket_path)
+        publisher = BusClient(socket_path)
+        await client.stop()
+        
+        for product_id in range(10):
+            await publisher.publish(PRODUCT_CHANGED, product_id=product_id)
+        client.start()
+        await wait_for(lambda: received)
+        
+        assert received == [(RESET, 10)]
+        await client.stop()
+        await publisher.stop()
+
+    @pytest.mark.asyncio
+    async def test_b167_reset_after_broker_restart(self, socket_path):
+        """Б167: После перезапуска брокера (новый epoch) подписчик получает reset, затем новые события"""
+        broker = await InvalidationBroker(socket_path).start()
+        client, received = await self.subscriber(socket_path)
+        publisher = BusClient(socket_path)
+        await publisher.publish(PRODUCT_CHANGED, product_id=1)
+        await wait_for(lambda: len(received) == 1)
+        
+        await broker.close()
+        broker = await InvalidationBroker(socket_path).start()
+        await wait_for(lambda: received[-1][0] == RESET)
+        await publisher.publish(PRODUCT_CHANGED, product_id=2)
+        await wait_for(lambda: len(received) == 3)
+        
+        assert received == [(PRODUCT_CHANGED, 1), (RESET, 0), (PRODUCT_CHANGED, 1)]
+        await client.stop()
+        await publisher.stop()
+        await broker.close()
+
+    def test_b168_supervisor_workers_share_bus(self, tmp_path):
+        """Б168: Событие, опубликованное из одного воркера, доходит до кэшей всех воркеров"""
+        with Supervisor(bus_handler, workers=3, bus_path=str(tmp_path / "bus.sock"),
+                        on_start=subscribe_cache) as supervisor:
+            users = {supervisor.worker_for(user_id): user_id for user_id in range(1, 100)}
+            supervisor.dispatch({'update_id': 0, 'user_id': users['worker-0'], 'action': 'publish', 'product_id': 7})
+            supervisor.wait_idle()
+        
+            seen = {}
+            for attempt in range(1, 6):
+                for index, user_id in enumerate(users.values()):
+                    update_id = attempt * 10 + index
+                    supervisor.dispatch({'update_id': update_id, 'user_id': user_id, 'action': 'check'})
+                supervisor.wait_idle()
+                seen = {
+                    worker: value for key, (worker, value) in supervisor.results.items()
+                    if key // 10 == attempt
+                }
+                if all(value == [7] for value in seen.values()):
+                    break
+        
+        assert len(users) == 3
+        assert seen == {'worker-0': [7], 'worker-1': [7], 'worker-2': [7]}
+
+    @pytest.mark.asyncio
+    async def test_b179_failing_handler_keeps_subscription(self, broker, socket_path):
+        """Б179: Исключение в обработчике и повреждённые строки не обрывают подписку"""
+        client = BusClient(socket_path, reconnect_delay=0.01)
+        received = []
+        def flaky_cache(event):
+            if event['product_id'] == 1:
+                raise RuntimeError("cache is broken")
+        client.on(PRODUCT_CHANGED, flaky_cache)
+        client.on(PRODUCT_CHANGED, lambda event: received.append(event['product_id']))
+        client.start()
+        await asyncio.wait_for(client.connected.wait(), 5)
+        publisher = BusClient(socket_path)
+        
+        await publisher.publish(PRODUCT_CHANGED, product_id=1)
+        for writer in broker._subscribers:
+            writer.write(b'not json\n{"type": "product_changed"}\n')
+        await publisher.publish(PRODUCT_CHANGED, product_id=2)
+        await wait_for(lambda: len(received) == 2)
+        
+        assert received == [1, 2]
+        assert client.last_seq == 2
+        assert not client._task.done()
+        await client.stop()
+        await publisher.stop()
+
+    @pytest.mark.asyncio
+    async def test_b187_malformed_request_skipped_by_broker(self, broker, socket_path):
+        """Б187: Повреждённые запросы к брокеру пропускаются, соединение продолжает работать"""
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        
+        writer.write(b'not json\n[1, 2]\n{"op": "publish"}\n{"op": "unknown"}\n')
+        writer.write(b'{"op": "publish", "event": {"type": "product_changed", "product_id": 1}}\n')
+        await writer.drain()
+        ack = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        
+        assert ack == {'type': 'ack', 'seq': 1}
+        assert broker.seq == 1
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_b188_slow_subscriber_dropped(self, socket_path):
+        """Б188: Подписчик, не читающий события, отключается брокером и при переподключении получает reset"""
+        broker = await InvalidationBroker(socket_path, retain=5, max_buffer=64 * 1024).start()
+        client, received = await self.subscriber(socket_path)
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(encode({'op': 'subscribe', 'epoch': None}))
+        await writer.drain()
+        welcome = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        await wait_for(lambda: len(broker._subscribers) == 2)
+        
+        for product_id in range(2000):
+            broker.publish({'type': PRODUCT_CHANGED, 'product_id': product_id, 'name': 'x' * 1000})
+            await asyncio.sleep(0)
+        
+        assert len(broker._subscribers) == 1
+        while await asyncio.wait_for(reader.readline(), 5):
+            pass
+        writer.close()
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(encode({'op': 'subscribe', 'epoch': welcome['epoch'], 'last_seq': welcome['seq']}))
+        await writer.drain()
+        assert json.loads(await asyncio.wait_for(reader.readline(), 5))['type'] == RESET
+        await wait_for(lambda: len(received) == 2000)
+        writer.close()
+        await client.stop()
+        await broker.close()
+
+    @pytest.mark.asyncio
+    async def test_b189_oversized_event_resets_subscriber(self, broker, socket_path):
+        """Б189: Событие длиннее лимита строки не обрывает подписку, а приводит к reset"""
+        client = BusClient(socket_path, reconnect_delay=0.01, limit=1024)
+        received = []
+        for kind in (PRODUCT_CHANGED, RESET):
+            client.on(kind, lambda event: received.append((event['type'], event['seq'])))
+        client.start()
+        await asyncio.wait_for(client.connected.wait(), 5)
+        publisher = BusClient(socket_path)
+        
+        await publisher.publish(PRODUCT_CHANGED, product_id=1)
+        await publisher.publish(PRODUCT_CHANGED, product_id=2, name='x' * 4096)
+        await wait_for(lambda: received and received[-1][0] == RESET)
+        await publisher.publish(PRODUCT_CHANGED, product_id=3)
+        await wait_for(lambda: received[-1] == (PRODUCT_CHANGED, 3))
+        
+        assert received == [(PRODUCT_CHANGED, 1), (RESET, 2), (PRODUCT_CHANGED, 3)]
+        assert not client._task.done()
+        await client.stop()
+        await publisher.stop()
@@ -1,6 +1,6 @@
 """
 Блочные тесты модуля каталога (CatalogService).
-Тесты Б1-Б14.
+Тесты Б1-Б14, Б169-Б171.
 """
 
 import pytest
@@ -160,3 +160,44 @@ class TestCatalogService:
         
         with pytest.raises(CategoryNotEmptyError):
             await service.delete_category(1)
+
+    @pytest.mark.asyncio
+    async def test_b169_update_product_publishes_invalidation(self, mock_product_repo, mock_bus):
+        """Б169: Изменение товара 3 публикует product_changed и новую версию каталога"""
+        service = CatalogService(product_repo=mock_product_repo, bus=mock_bus)
+        version = service.catalog_version
+        
+        await service.update_product(3, ProductUpdate(price=Decimal('69990')))
+        
+        assert service.catalog_version == version + 1
+        assert mock_bus.published == [
+            {'type': 'product_changed', 'product_id': 3},
+            {'type': 'catalog_version', 'version': version + 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_b170_create_category_publishes_invalidation(self, mock_product_repo, mock_bus):
+        """Б170: Создание категории публикует category_changed с id новой категории"""
+        service = CatalogService(product_repo=mock_product_repo, bus=mock_bus)
+        
+        category = await service.create_category("Планшеты")
+        
+        assert {'type': 'category_changed', 'category_id': category.id} in mock_bus.published
+        assert mock_bus.published[-1]['type'] == 'catalog_version'
+
+    @pytest.mark.asyncio
+    async def test_b171_cache_invalidated_by_bus_event(self, mock_product_repo, mock_bus):
+        """Б171: Событие product_changed из другого процесса сбрасывает кэш товара, reset — весь кэш"""
+        service = CatalogService(product_repo=mock_product_repo, bus=mock_bus)
+        
+        await service.get_product(3)
+        await service.get_product(3)
+        assert mock_product_repo.fetch_product_by_id.await_count == 1
+        
+        await mock_bus.deliver('product_changed', product_id=3, seq=1)
+        await service.get_product(3)
+        assert mock_product_repo.fetch_product_by_id.await_count == 2
+        
+        await mock_bus.deliver('reset', seq=0)
+        await service.get_product(3)
+        assert mock_product_repo.fetch_product_by_id.await_count == 3
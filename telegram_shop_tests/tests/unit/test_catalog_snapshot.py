@@ -0,0 +1,112 @@
+"""
+Блочные тесты бинарного снимка каталога (tests.catalog_snapshot).
+Тесты Б174-Б178, Б195.
+"""
+
+import mmap
+import pytest
+from decimal import Decimal
+from tests.catalog_snapshot import (
+    HEADER, SECTION, CatalogSnapshot, SnapshotProductRepo, write_snapshot, write_snapshot_from_repo
+)
+from tests.inmemory import ProductRecord
+
+
+class TestCatalogSnapshot:
+
+    @pytest.fixture
+    async def snapshot_repo(self, inmemory_backend, tmp_path):
+        path = str(tmp_path / "catalog.snap")
+        await write_snapshot_from_repo(path, 1, inmemory_backend.product_repo)
+        repo = SnapshotProductRepo(path)
+        yield repo
+        repo.snapshot.close()
+
+    @pytest.mark.asyncio
+    async def test_b174_snapshot_matches_repository(self, snapshot_repo, inmemory_backend):
+        """Б174: Товары, категории и выборки по категории из снимка совпадают с исходным репозиторием"""
+        source = inmemory_backend.product_repo
+        
+        product = await snapshot_repo.fetch_product_by_id(3)
+        
+        assert (product.name, product.price, product.stock, product.category_id) == (
+            "Samsung Galaxy S24", Decimal('79990'), 10, 1
+        )
+        assert await snapshot_repo.fetch_product_by_id(99) is None
+        assert [c.id for c in await snapshot_repo.fetch_categories()] == [c.id for c in await source.fetch_categories()]
+        assert ([p.id for p in await snapshot_repo.fetch_products_by_category(1)]
+                == sorted(p.id for p in await source.fetch_products_by_category(1)))
+        assert await snapshot_repo.count_products_in_category(2) == await source.count_products_in_category(2)
+        assert await snapshot_repo.fetch_products_by_category(999) == []
+
+    @pytest.mark.asyncio
+    async def test_b175_columns_zero_copy(self, snapshot_repo):
+        """Б175: id, цены и остатки — read-only memoryview поверх mmap, без копирования"""
+        snapshot = snapshot_repo.snapshot
+        
+        assert isinstance(snapshot.ids.obj, mmap.mmap)
+        assert snapshot.prices.obj is snapshot.ids.obj is snapshot.stock.obj
+        assert snapshot.ids.readonly and snapshot.prices.readonly
+        row = snapshot.row_of(3)
+        assert snapshot.prices[row] == 7999000
+        assert snapshot.stock[row] == 10
+
+    @pytest.mark.asyncio
+    async def test_b176_search_index(self, snapshot_repo):
+        """Б176: Поисковый индекс снимка: все слова запроса, последнее — как префикс, без неактивных"""
+        assert [p.id for p in await snapshot_repo.search_products("iPhone 15")] == [1, 2]
+        assert [p.id for p in await snapshot_repo.search_products("galax")] == [3]
+        assert await snapshot_repo.search_products("Архивный") == []
+        assert await snapshot_repo.search_products("несуществующий") == []
+
+    @pytest.mark.asyncio
+    async def test_b177_atomic_versioned_replacement(self, snapshot_repo, test_categories):
+        """Б177: Новая версия снимка заменяет файл атомарно, старые представления остаются валидными"""
+        old = snapshot_repo.snapshot
+        old_prices = old.prices
+        
+        write_snapshot(snapshot_repo.path, 2, test_categories, [ProductRecord(3, "Samsung Galaxy S24", 69990, stock=4)])
+        
+        assert snapshot_repo.refresh() is True
+        assert snapshot_repo.refresh() is False
+        assert snapshot_repo.snapshot.version == 2
+        assert (await snapshot_repo.fetch_product_by_id(3)).price == Decimal('69990')
+        assert old.version == 1
+        assert old_prices[old.row_of(3)] == 7999000
+        old.close()
+
+    @pytest.mark.asyncio
+    async def test_b178_refresh_on_catalog_version_event(self, snapshot_repo, test_categories, mock_bus):
+        """Б178: Событие catalog_version из шины инвалидации переоткрывает снимок"""
+        snapshot_repo.watch(mock_bus)
+        write_snapshot(snapshot_repo.path, 2, test_categories, [])
+        
+        await mock_bus.deliver('catalog_version', version=2, seq=1)
+        
+        assert snapshot_repo.snapshot.version == 2
+        assert await snapshot_repo.fetch_all_products() == []
+
+    def test_b195_broken_snapshot_releases_mmap(self, snapshot_repo, tmp_path, monkeypatch):
+        """Б195: Повреждённый снимок (нет секции, обрезан, неверная длина колонки) не оставляет открытый mmap"""
+        data = open(snapshot_repo.path, 'rb').read()
+        name, offset, _ = SECTION.unpack_from(data, HEADER.size)
+        broken = {
+            'missing_section': data.replace(b'cat_rows', b'cat_rowz', 1),
+            'truncated': data[:HEADER.size - 1],
+            'bad_column': data[:HEADER.size] + SECTION.pack(name, offset, 3) + data[HEADER.size + SECTION.size:],
+        }
+        opened = []
+        real_mmap = mmap.mmap
+        def recording_mmap(*args, **kwargs):
+            opened.append(real_mmap(*args, **kwargs))
+            return opened[-1]
+        monkeypatch.setattr(mmap, 'mmap', recording_mmap)
+        
+        for label, content in broken.items():
+            path = tmp_path / f"{label}.snap"
+            path.write_bytes(content)
+            with pytest.raises((ValueError, TypeError)):
+                CatalogSnapshot(str(path))
+        
+        assert len(opened) == len(broken)
+        assert all(m.closed for m in opened)
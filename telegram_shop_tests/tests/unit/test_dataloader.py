@@ -0,0 +1,95 @@
+"""
+Блочные тесты пакетной загрузки в рамках обновления (DataLoader).
+Тесты Б128-Б131, Б183.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.utils.dataloader import DataLoader, request_scope
+from app.services.cart_service import CartService
+from app.services.favorites_service import FavoritesService
+from app.services.order_service import OrderService
+from app.services.profile_service import ProfileService
+
+
+class TestDataLoader:
+
+    @pytest.mark.asyncio
+    async def test_b128_loads_in_same_tick_batched(self):
+        """Б128: Загрузки, выданные в одном такте цикла событий, объединяются в один пакетный запрос"""
+        batch_fn = AsyncMock(side_effect=lambda keys: [f"value-{k}" for k in keys])
+        loader = DataLoader(batch_fn)
+        
+        results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+        
+        assert results == ["value-1", "value-2", "value-1"]
+        batch_fn.assert_awaited_once_with([1, 2])
+
+    @pytest.mark.asyncio
+    async def test_b129_loads_memoized(self):
+        """Б129: Повторная загрузка того же ключа берётся из памяти без обращения к репозиторию"""
+        batch_fn = AsyncMock(side_effect=lambda keys: [f"value-{k}" for k in keys])
+        loader = DataLoader(batch_fn)
+        
+        await loader.load(1)
+        result = await loader.load(1)
+        
+        assert result == "value-1"
+        assert batch_fn.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_b130_services_share_product_loader(self, mock_cart_repo, mock_product_repo, mock_favorites_repo):
+        """Б130: Сервисы внутри request_scope загружают товары одним пакетным запросом"""
+        mock_product_repo.fetch_product_by_id = AsyncMock()
+        cart_service = CartService(cart_repo=mock_cart_repo, product_repo=mock_product_repo)
+        favorites_service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        
+        async with request_scope(product_repo=mock_product_repo, favorites_repo=mock_favorites_repo):
+            results = await asyncio.gather(
+                cart_service.check_stock(product_id=3, qty=5),
+                cart_service.check_stock(product_id=4, qty=5),
+                favorites_service.add_favorite(user_id=4, product_id=3),
+            )
+        
+        assert results[:2] == [True, False]
+        assert 3 in mock_favorites_repo._data[4]
+        mock_product_repo.fetch_products_by_ids.assert_awaited_once()
+        mock_product_repo.fetch_product_by_id.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_b131_services_share_user_and_order_loaders(self, mock_user_repo, mock_order_repo):
+        """Б131: Профиль и заказ в одном обновлении используют общие пакетные загрузчики пользователей и заказов"""
+        profile_service = ProfileService(user_repo=mock_user_repo, order_repo=mock_order_repo)
+        order_service = OrderService(order_repo=mock_order_repo)
+        
+        async with request_scope(user_repo=mock_user_repo, order_repo=mock_order_repo):
+            profile, order, same_order = await asyncio.gather(
+                profile_service.get_profile(user_id=1),
+                order_service.get_order(order_id=2, user_id=1),
+                order_service.get_order(order_id=2, user_id=1),
+            )
+        
+        assert profile.name == "Иван Тестовый"
+        assert order.order_number == same_order.order_number == "ORD-20241201-0002"
+        assert mock_user_repo.get_users_by_ids.await_count == 1
+        assert mock_order_repo.get_orders_by_ids.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_b183_favorite_flags_batched(self, mock_favorites_repo, mock_product_repo):
+        """Б183: Флаги избранного для карточек одного обновления загружаются одним exists_favorites"""
+        mock_favorites_repo.exists_favorite = AsyncMock()
+        mock_favorites_repo._data[1] = [5]
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        
+        async with request_scope(product_repo=mock_product_repo, favorites_repo=mock_favorites_repo):
+            flags = await asyncio.gather(
+                service.is_favorite(user_id=1, product_id=5),
+                service.is_favorite(user_id=1, product_id=3),
+                service.is_favorite(user_id=4, product_id=5),
+            )
+        
+        assert flags == [True, False, False]
+        mock_favorites_repo.exists_favorites.assert_awaited_once()
+        assert sorted(mock_favorites_repo.exists_favorites.await_args.args[0]) == [(1, 3), (1, 5), (4, 5)]
+        mock_favorites_repo.exists_favorite.assert_not_awaited()
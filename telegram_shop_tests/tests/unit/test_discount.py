@@ -1,11 +1,14 @@
 """
 Блочные тесты модуля скидок (DiscountService).
-Тесты Б41-Б48.
+Тесты Б41-Б48, Б83-Б91, Б172-Б173.
 """
 
+import asyncio
+import json
 import pytest
 from decimal import Decimal
 from datetime import datetime
+from unittest.mock import AsyncMock, patch
 from app.services.discount_service import DiscountService
 from app.dto import Cart, CartItem
 
@@ -93,3 +96,172 @@ class TestDiscountService:
         result = await service.check_promo_usage("SAVE10", user_id=1)
         
         assert result == False
+
+    @pytest.mark.asyncio
+    async def test_b83_check_promo_usage_from_warm_cache(self, mock_promocode_repo):
+        """Б83: После прогрева кэша проверка использования не обращается к репозиторию"""
+        mock_promocode_repo._usage[("USED", 1)] = True
+        mock_promocode_repo.check_user_usage = AsyncMock(return_value=False)
+        service = DiscountService(promocode_repo=mock_promocode_repo)
+        await service.warm_usage_cache()
+        
+        assert await service.check_promo_usage("used", user_id=1) == True
+        assert await service.check_promo_usage("SAVE10", user_id=1) == False
+        mock_promocode_repo.check_user_usage.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_b84_record_usage_flushed_in_batch(self, mock_promocode_repo):
+        """Б84: Записи об использовании копятся в буфере и сохраняются одним пакетом при flush"""
+        service = DiscountService(promocode_repo=mock_promocode_repo, usage_flush_size=10)
+        await service.warm_usage_cache()
+        
+        await service.record_usage("SAVE10", user_id=1, order_id=1)
+        await service.record_usage("SAVE20", user_id=2, order_id=2)
+        
+        mock_promocode_repo.record_usage_batch.assert_not_awaited()
+        assert await service.check_promo_usage("SAVE10", user_id=1) == True
+        
+        await service.flush_usage()
+        
+        mock_promocode_repo.record_usage_batch.assert_awaited_once()
+        assert ("SAVE10", 1) in mock_promocode_repo._usage
+        assert ("SAVE20", 2) in mock_promocode_repo._usage
+
+    @pytest.mark.asyncio
+    async def test_b85_record_usage_concurrent_single_winner(self, mock_promocode_repo):
+        """Б85: Параллельное применение одного промокода одним пользователем проходит только один раз"""
+        service = DiscountService(promocode_repo=mock_promocode_repo)
+        await service.warm_usage_cache()
+        
+        results = await asyncio.gather(*[
+            service.record_usage("SAVE10", user_id=1, order_id=order_id)
+            for order_id in range(1, 6)
+        ])
+        
+        assert results.count(True) == 1
+        assert results.count(False) == 4
+
+    @pytest.fixture
+    def sample_carts(self):
+        return [
+            Cart(user_id=1, items=[
+                CartItem(product_id=2, product_name="iPhone 15", price=Decimal('89990'), qty=1),
+                CartItem(product_id=7, product_name="Чехол iPhone", price=Decimal('1990'), qty=2)
+            ]),
+            Cart(user_id=2, items=[
+                CartItem(product_id=7, product_name="Чехол iPhone", price=Decimal('1990.50'), qty=3)
+            ]),
+            Cart(user_id=3, items=[
+                CartItem(product_id=5, product_name="MacBook Pro 14", price=Decimal('199990'), qty=1)
+            ]),
+            Cart(user_id=4, items=[]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_b86_apply_discounts_batch_matches_single(self, mock_promocode_repo, sample_carts):
+        """Б86: Пакетный расчёт скидок совпадает с поштучным apply_discounts для каждой корзины"""
+        service = DiscountService(promocode_repo=mock_promocode_repo)
+        
+        expected = [await service.apply_discounts(cart, "SAVE10") for cart in sample_carts]
+        results = await service.apply_discounts_batch(sample_carts, "SAVE10")
+        
+        assert results == expected
+
+    @pytest.mark.asyncio
+    async def test_b87_apply_discounts_batch_vectorized(self, mock_promocode_repo, sample_carts):
+        """Б87: Векторизованный расчёт в копейках (NumPy) совпадает с поштучным расчётом"""
+        pytest.importorskip("numpy")
+        service = DiscountService(promocode_repo=mock_promocode_repo)
+        
+        expected, results = {}, {}
+        for code in (None, "SAVE10", "FIXED5000"):
+            expected[code] = [await service.apply_discounts(cart, code) for cart in sample_carts]
+            results[code] = await service.apply_discounts_batch(sample_carts, code, vectorized=True)
+        
+        assert results == expected
+
+    @pytest.mark.asyncio
+    async def test_b88_apply_discounts_batch_validates_promo_once(self, mock_promocode_repo, sample_carts):
+        """Б88: Пакетный расчёт загружает промокод из репозитория один раз на всю пачку"""
+        service = DiscountService(promocode_repo=mock_promocode_repo)
+        
+        with patch.object(
+            mock_promocode_repo, 'get_promocode_by_code',
+            new_callable=AsyncMock, side_effect=mock_promocode_repo.get_promocode_by_code
+        ) as get_promocode_by_code:
+            results = await service.apply_discounts_batch(sample_carts, "SAVE10")
+        
+        assert len(results) == len(sample_carts)
+        assert get_promocode_by_code.await_count == 1
+
+    @pytest.fixture
+    def tiers_file(self, tmp_path):
+        path = tmp_path / "auto_discount_tiers.json"
+        path.write_text(json.dumps([
+            {"threshold": "30000", "percent": "3"},
+            {"threshold": "50000", "percent": "5"},
+            {"threshold": "100000", "percent": "7"},
+        ]))
+        return path
+
+    def test_b89_auto_discount_tiers_from_config(self, mock_promocode_repo, tiers_file):
+        """Б89: Автоскидка по таблице ступеней из конфига учитывает границы и округляется до копеек"""
+        service = DiscountService(
+            promocode_repo=mock_promocode_repo, config={'auto_discount_tiers_file': str(tiers_file)}
+        )
+        
+        assert service.calculate_auto_discount(Decimal('29999.99')) == Decimal('0')
+        assert service.calculate_auto_discount(Decimal('30000')) == Decimal('900')
+        assert service.calculate_auto_discount(Decimal('33333.33')) == Decimal('1000.00')
+        assert service.calculate_auto_discount(Decimal('50000')) == Decimal('2500')
+        assert service.calculate_auto_discount(Decimal('100000')) == Decimal('7000')
+
+    def test_b90_auto_discount_tiers_hot_reload(self, mock_promocode_repo, tiers_file):
+        """Б90: Изменение файла ступеней применяется после reload_tiers без перезапуска"""
+        service = DiscountService(
+            promocode_repo=mock_promocode_repo, config={'auto_discount_tiers_file': str(tiers_file)}
+        )
+        assert service.calculate_auto_discount(Decimal('40000')) == Decimal('1200')
+        
+        tiers_file.write_text(json.dumps([{"threshold": "40000", "percent": "10"}]))
+        service.reload_tiers()
+        
+        assert service.calculate_auto_discount(Decimal('40000')) == Decimal('4000')
+        assert service.calculate_auto_discount(Decimal('30000')) == Decimal('0')
+
+    def test_b91_amount_to_next_tier(self, mock_promocode_repo, tiers_file):
+        """Б91: Сумма до следующей ступени автоскидки для экрана корзины"""
+        service = DiscountService(
+            promocode_repo=mock_promocode_repo, config={'auto_discount_tiers_file': str(tiers_file)}
+        )
+        
+        assert service.amount_to_next_tier(Decimal('10000')) == Decimal('20000')
+        assert service.amount_to_next_tier(Decimal('45000')) == Decimal('5000')
+        assert service.amount_to_next_tier(Decimal('99999.99')) == Decimal('0.01')
+        assert service.amount_to_next_tier(Decimal('120000')) is None
+
+    @pytest.mark.asyncio
+    async def test_b172_update_promocode_publishes_invalidation(self, mock_promocode_repo, mock_bus):
+        """Б172: Изменение промокода SAVE10 сохраняется в репозитории и публикует promo_changed"""
+        from app.dto import PromocodeUpdate
+        service = DiscountService(promocode_repo=mock_promocode_repo, bus=mock_bus)
+        
+        await service.update_promocode("SAVE10", PromocodeUpdate(discount_value=Decimal('15')))
+        
+        mock_promocode_repo.update_promocode.assert_awaited_once()
+        assert mock_bus.published == [{'type': 'promo_changed', 'code': 'SAVE10'}]
+
+    @pytest.mark.asyncio
+    async def test_b173_promo_cache_invalidated_by_bus_event(self, mock_promocode_repo, mock_bus):
+        """Б173: После promo_changed из другого процесса валидация видит новую скидку промокода"""
+        service = DiscountService(promocode_repo=mock_promocode_repo, bus=mock_bus)
+        await service.validate_promo("SAVE10", datetime.utcnow())
+        await service.validate_promo("SAVE10", datetime.utcnow())
+        assert mock_promocode_repo.get_promocode_by_code.await_count == 1
+        
+        promocode = await mock_promocode_repo.get_promocode_by_code("SAVE10")
+        promocode.discount_value = Decimal('15')
+        await mock_bus.deliver('promo_changed', code='SAVE10', seq=1)
+        result = await service.validate_promo("SAVE10", datetime.utcnow())
+        
+        assert result.discount_value == Decimal('15')
@@ -1,9 +1,10 @@
 """
 Блочные тесты модуля избранного (FavoritesService).
-Тесты Б57-Б64.
+Тесты Б57-Б64, Б92-Б95, Б190-Б191.
 """
 
 import pytest
+from unittest.mock import AsyncMock
 from app.services.favorites_service import FavoritesService
 from app.exceptions import ProductNotFoundError
 
@@ -86,3 +87,88 @@ class TestFavoritesService:
         result = await service.is_favorite(user_id=4, product_id=5)
         
         assert result == False
+
+    @pytest.mark.asyncio
+    async def test_b92_is_favorite_many_single_lookup(self, mock_favorites_repo, mock_product_repo):
+        """Б92: Проверка избранного для страницы из 20 карточек выполняет один запрос к репозиторию"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        mock_favorites_repo._data[1] = [2, 5, 7]
+        mock_favorites_repo.exists_favorite = AsyncMock(return_value=False)
+        product_ids = list(range(1, 21))
+        
+        result = await service.is_favorite_many(user_id=1, product_ids=product_ids)
+        
+        assert result == {pid: pid in (2, 5, 7) for pid in product_ids}
+        assert mock_favorites_repo.get_favorite_ids.await_count == 1
+        mock_favorites_repo.exists_favorite.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_b93_favorites_cache_updated_on_add_remove(self, mock_favorites_repo, mock_product_repo):
+        """Б93: Добавление и удаление обновляют кэш избранного без повторной загрузки"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        mock_favorites_repo._data[1] = [5]
+        await service.is_favorite_many(user_id=1, product_ids=[5])
+        
+        await service.add_favorite(user_id=1, product_id=3)
+        await service.remove_favorite(user_id=1, product_id=5)
+        result = await service.is_favorite_many(user_id=1, product_ids=[3, 5])
+        
+        assert result == {3: True, 5: False}
+        assert await service.is_favorite(user_id=1, product_id=3) == True
+        assert mock_favorites_repo.get_favorite_ids.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_b94_list_favorites_single_query(self, mock_favorites_repo, mock_product_repo):
+        """Б94: Список избранного загружается одним запросом и не содержит неактивных товаров"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        mock_favorites_repo._data[1] = [3, 99, 2]
+        mock_product_repo.fetch_product_by_id = AsyncMock()
+        
+        products = await service.list_favorites(user_id=1)
+        
+        assert [p.id for p in products] == [3, 2]
+        assert mock_favorites_repo.get_favorite_products.await_count == 1
+        mock_product_repo.fetch_product_by_id.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_b95_list_favorites_pagination(self, mock_favorites_repo, mock_product_repo):
+        """Б95: Постраничный вывод избранного в порядке добавления: limit=2, offset=2"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo)
+        mock_favorites_repo._data[1] = [2, 3, 5, 7, 9]
+        
+        products = await service.list_favorites(user_id=1, limit=2, offset=2)
+        
+        assert [p.id for p in products] == [5, 7]
+
+    @pytest.mark.asyncio
+    async def test_b190_favorites_change_publishes_invalidation(self, mock_favorites_repo, mock_product_repo, mock_bus):
+        """Б190: Добавление и удаление избранного публикуют favorites_changed с id пользователя"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo, bus=mock_bus)
+        
+        await service.add_favorite(user_id=1, product_id=3)
+        await service.remove_favorite(user_id=1, product_id=3)
+        
+        assert mock_bus.published == [
+            {'type': 'favorites_changed', 'user_id': 1},
+            {'type': 'favorites_changed', 'user_id': 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_b191_favorites_cache_invalidated_by_bus_event(self, mock_favorites_repo, mock_product_repo, mock_bus):
+        """Б191: После переезда пользователя на другой воркер его изменения сбрасывают кэш избранного здесь"""
+        service = FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo, bus=mock_bus)
+        mock_favorites_repo._data[1] = [5]
+        mock_favorites_repo._data[2] = [7]
+        await service.is_favorite_many(user_id=1, product_ids=[3, 5])
+        await service.is_favorite_many(user_id=2, product_ids=[7])
+        
+        mock_favorites_repo._data[1] = [3]
+        await mock_bus.deliver('favorites_changed', user_id=1, seq=1)
+        
+        assert await service.is_favorite_many(user_id=1, product_ids=[3, 5]) == {3: True, 5: False}
+        assert await service.is_favorite_many(user_id=2, product_ids=[7]) == {7: True}
+        assert mock_favorites_repo.get_favorite_ids.await_count == 3
+        
+        await mock_bus.deliver('reset', seq=0)
+        await service.is_favorite_many(user_id=2, product_ids=[7])
+        assert mock_favorites_repo.get_favorite_ids.await_count == 4
@@ -0,0 +1,106 @@
+"""
+Блочные тесты in-memory бэкенда репозиториев (InMemoryBackend).
+Тесты Б132-Б136, Б182.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from tests.inmemory import InMemoryBackend
+
+
+class TestInMemoryBackend:
+
+    @pytest.mark.asyncio
+    async def test_b132_category_index_follows_updates(self, inmemory_backend):
+        """Б132: Индекс по категории учитывает удаление и перенос товара в другую категорию"""
+        repo = inmemory_backend.product_repo
+        
+        await repo.delete_product(50)
+        await repo.update_product(4, SimpleNamespace(category_id=2, price=None, stock=None, name=None))
+        
+        assert [p.id for p in await repo.fetch_products_by_category(1)] == [1, 2, 3]
+        assert 4 in [p.id for p in await repo.fetch_products_by_category(2)]
+        assert await repo.count_products_in_category(1) == 3
+        assert await repo.fetch_product_by_id(50) is None
+
+    @pytest.mark.asyncio
+    async def test_b133_cart_items_joined_with_products(self, inmemory_backend):
+        """Б133: Позиции корзины содержат актуальные название, цену и остаток товара"""
+        repo = inmemory_backend.cart_repo
+        
+        await repo.upsert_cart_item(1, 3, 2)
+        await repo.upsert_cart_item(1, 3, 4)
+        await inmemory_backend.product_repo.update_product(
+            3, SimpleNamespace(price=Decimal('74990'), stock=None, name=None)
+        )
+        items = await repo.get_cart_items(1)
+        
+        assert items == [{
+            'product_id': 3, 'qty': 4, 'name': "Samsung Galaxy S24",
+            'price': Decimal('74990'), 'stock': 10, 'is_active': True
+        }]
+
+    @pytest.mark.asyncio
+    async def test_b134_user_and_favorites_indexes(self, inmemory_backend):
+        """Б134: Постраничная выборка пользователей и избранное в порядке добавления"""
+        users = inmemory_backend.user_repo
+        favorites = inmemory_backend.favorites_repo
+        for product_id in (5, 99, 2, 5):
+            await favorites.add_favorite(1, product_id)
+        
+        assert [u.id for u in await users.list_users_page(after_id=2, limit=3)] == [3, 4, 8]
+        assert [p.id for p in await favorites.get_favorite_products(1)] == [5, 2]
+        assert await favorites.exists_favorites([(1, 2), (1, 3)]) == [True, False]
+        assert [o.id for o in await inmemory_backend.order_repo.list_orders_by_user(1)] == [1, 2, 3]
+        assert (await inmemory_backend.promocode_repo.get_promocode_by_code("save10")).code == "SAVE10"
+
+    @pytest.mark.asyncio
+    async def test_b135_snapshot_roundtrip(self, inmemory_backend, tmp_path):
+        """Б135: Снимок на диск и загрузка восстанавливают состояние всех репозиториев"""
+        path = tmp_path / "backend.pickle"
+        await inmemory_backend.favorites_repo.add_favorite(1, 3)
+        await inmemory_backend.promocode_repo.record_usage("SAVE10", 1, 1)
+        
+        inmemory_backend.snapshot(str(path))
+        restored = InMemoryBackend.load(str(path))
+        
+        assert (await restored.product_repo.fetch_product_by_id(3)).name == "Samsung Galaxy S24"
+        assert await restored.favorites_repo.exists_favorite(1, 3) == True
+        assert await restored.promocode_repo.check_user_usage("save10", 1) == True
+        assert [p.name for p in await restored.product_repo.fetch_categories()][0] == "Смартфоны"
+
+    @pytest.mark.asyncio
+    async def test_b136_generate_catalog(self):
+        """Б136: Сгенерированный каталог распределяет товары по категориям через индекс"""
+        backend = InMemoryBackend.generate(products=10_000, categories=10, users=100)
+        repo = backend.product_repo
+        
+        counts = [await repo.count_products_in_category(c) for c in range(1, 11)]
+        
+        assert sum(counts) == 10_000
+        assert counts == [1000] * 10
+        assert (await repo.fetch_product_by_id(10_000)).category_id == 1
+        assert len(await backend.user_repo.list_users_page(after_id=90)) == 10
+
+    @pytest.mark.asyncio
+    async def test_b182_id_counters_and_paid_orders_index(self, inmemory_backend):
+        """Б182: Новые id продолжают счётчик, индекс оплаченных заказов по дате следует за статусом"""
+        products = inmemory_backend.product_repo
+        orders = inmemory_backend.order_repo
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        product = await products.insert_product(
+            SimpleNamespace(name="Новый товар", price=Decimal('990'), stock=1, category_id=1)
+        )
+        category = await products.insert_category("Новая категория")
+        await orders.update_order_status(2, 'shipped')
+        await orders.update_order_status(1, 'paid')
+        paid = await orders.list_paid_orders(today, today + timedelta(days=1))
+        
+        assert product.id == max(p.id for p in await products.fetch_all_products())
+        assert category.id == max(c.id for c in await products.fetch_categories())
+        assert sorted(o.id for o in paid) == [1, 4]
+        assert await orders.list_paid_orders(today + timedelta(days=1), today + timedelta(days=2)) == []
+        assert products.product_record(50) is not None
@@ -0,0 +1,75 @@
+"""
+Блочные тесты генератора нагрузки (tests.load.loadgen).
+Тесты Б154-Б157.
+"""
+
+import asyncio
+import time
+import pytest
+from tests.load.loadgen import LoadGenerator, LatencyStats, percentile
+
+
+class TestLoadGenerator:
+
+    def test_b154_percentiles(self):
+        """Б154: p50/p95/p99 считаются по отсортированной выборке, пустая выборка даёт 0"""
+        stats = LatencyStats()
+        for value in range(100, 0, -1):
+            stats.add(value / 1000)
+        
+        summary = stats.summary()
+        
+        assert summary['count'] == 100
+        assert summary['p50'] == pytest.approx(0.050, abs=0.001)
+        assert summary['p95'] == pytest.approx(0.095, abs=0.001)
+        assert summary['p99'] == pytest.approx(0.099, abs=0.001)
+        assert summary['max'] == 0.100
+        assert percentile([], 0.99) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_b155_steps_and_throughput_reported(self):
+        """Б155: Каждый пользователь проходит сценарий iterations раз, шаги и пропускная способность в отчёте"""
+        async def journey(session):
+            async with session.step('catalog'):
+                await asyncio.sleep(0)
+            await session.think()
+            async with session.step('order'):
+                await asyncio.sleep(0)
+        
+        generator = LoadGenerator({'buy': (1, journey)}, users=200, iterations=3)
+        report = await generator.run()
+        
+        assert report['journeys']['buy']['count'] == 600
+        assert report['steps']['catalog']['count'] == 600
+        assert report['steps']['order']['count'] == 600
+        assert report['journeys_per_sec'] > 0
+        assert set(report['loop_lag']) >= {'p50', 'p95', 'p99', 'max'}
+
+    @pytest.mark.asyncio
+    async def test_b156_ramp_up_spreads_user_starts(self):
+        """Б156: При ramp_up пользователи стартуют равномерно в пределах окна, а не одновременно"""
+        starts = {}
+        
+        async def journey(session):
+            starts[session.user_index] = time.perf_counter()
+        
+        generator = LoadGenerator({'visit': (1, journey)}, users=5, ramp_up=0.2)
+        await generator.run()
+        
+        assert starts[4] - starts[0] >= 0.18
+        assert starts[0] < starts[2] < starts[4]
+
+    @pytest.mark.asyncio
+    async def test_b157_step_errors_counted(self):
+        """Б157: Исключение в шаге учитывается как ошибка шага и сценария, прогон продолжается"""
+        async def journey(session):
+            async with session.step('checkout'):
+                if session.user_index % 2:
+                    raise RuntimeError("checkout failed")
+        
+        generator = LoadGenerator({'buy': (1, journey)}, users=10)
+        report = await generator.run()
+        
+        assert report['steps']['checkout']['errors'] == 5
+        assert report['steps']['checkout']['count'] == 5
+        assert report['journeys']['buy']['errors'] == 5
@@ -0,0 +1,154 @@
+"""
+Блочные тесты инструментирования сервисов (metrics).
+Тесты Б142-Б146, Б194.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from app.utils.metrics import MetricsRegistry, instrument_service, instrument_repo, start_metrics_server
+from app.services.cart_service import CartService
+from app.services.catalog_service import CatalogService
+from app.services.discount_service import DiscountService
+from app.services.favorites_service import FavoritesService
+from app.services.notification_service import NotificationService
+from app.services.order_service import OrderService
+from app.services.profile_service import ProfileService
+from app.services.receipt_service import ReceiptService
+from app.services.search_service import SearchService
+from app.exceptions import ProductNotFoundError
+from tests.conftest import MockOrder
+
+
+# (конструктор сервиса из фикстур, метод, аргументы) — по одному вызову для каждого сервиса магазина
+SERVICE_CALLS = {
+    'CatalogService': (
+        lambda fx: CatalogService(product_repo=fx('mock_product_repo')), 'get_categories', (), {}
+    ),
+    'SearchService': (
+        lambda fx: SearchService(product_repo=fx('mock_product_repo')), 'search_products', ("iPhone 15",), {}
+    ),
+    'CartService': (
+        lambda fx: CartService(cart_repo=fx('mock_cart_repo'), product_repo=fx('mock_product_repo')),
+        'get_cart', (1,), {}
+    ),
+    'DiscountService': (
+        lambda fx: DiscountService(promocode_repo=fx('mock_promocode_repo')),
+        'validate_promo', ("SAVE10", datetime.utcnow()), {}
+    ),
+    'NotificationService': (
+        lambda fx: NotificationService(bot=fx('mock_bot'), user_repo=fx('mock_user_repo'), config={'admin_ids': []}),
+        'notify_status_changed',
+        (MockOrder(id=3, user_id=1, order_number="ORD-20241202-0001", total=49990, status='shipped'),), {}
+    ),
+    'OrderService': (
+        lambda fx: OrderService(order_repo=fx('mock_order_repo')), 'get_order', (), {'order_id': 2, 'user_id': 1}
+    ),
+    'FavoritesService': (
+        lambda fx: FavoritesService(favorites_repo=fx('mock_favorites_repo'), product_repo=fx('mock_product_repo')),
+        'is_favorite', (), {'user_id': 1, 'product_id': 5}
+    ),
+    'ProfileService': (
+        lambda fx: ProfileService(user_repo=fx('mock_user_repo'), order_repo=fx('mock_order_repo')),
+        'get_profile', (), {'user_id': 1}
+    ),
+    'ReceiptService': (
+        lambda fx: ReceiptService(order_repo=fx('mock_order_repo'), receipts_dir=str(fx('tmp_path'))),
+        'get_receipt_data', (), {'order_id': 2}
+    ),
+}
+
+
+class TestMetrics:
+
+    @pytest.mark.asyncio
+    async def test_b142_service_calls_and_latency_recorded(self, mock_product_repo):
+        """Б142: Вызовы метода сервиса учитываются в счётчике и гистограмме задержек"""
+        registry = MetricsRegistry()
+        service = instrument_service(CatalogService(product_repo=mock_product_repo), registry)
+        
+        await service.get_categories()
+        await service.get_categories()
+        text = registry.render_prometheus()
+        
+        assert 'service_calls_total{service="CatalogService",method="get_categories"} 2' in text
+        assert 'service_call_duration_seconds_count{service="CatalogService",method="get_categories"} 2' in text
+        assert 'service_call_duration_seconds_bucket{service="CatalogService",method="get_categories",le="+Inf"} 2' in text
+
+    @pytest.mark.asyncio
+    async def test_b143_service_errors_counted(self, mock_favorites_repo, mock_product_repo):
+        """Б143: Исключение в методе сервиса учитывается в счётчике ошибок и пробрасывается дальше"""
+        registry = MetricsRegistry()
+        service = instrument_service(
+            FavoritesService(favorites_repo=mock_favorites_repo, product_repo=mock_product_repo), registry
+        )
+        
+        with pytest.raises(ProductNotFoundError):
+            await service.add_favorite(user_id=4, product_id=99999)
+        
+        text = registry.render_prometheus()
+        assert 'service_errors_total{service="FavoritesService",method="add_favorite",error="ProductNotFoundError"} 1' in text
+
+    @pytest.mark.asyncio
+    async def test_b144_repo_roundtrips_per_request(self, mock_favorites_repo, mock_product_repo):
+        """Б144: Количество обращений к репозиториям за один запрос попадает в гистограмму"""
+        registry = MetricsRegistry()
+        service = FavoritesService(
+            favorites_repo=instrument_repo(mock_favorites_repo, registry, name="favorites_repo"),
+            product_repo=instrument_repo(mock_product_repo, registry, name="product_repo")
+        )
+        
+        async with registry.request():
+            await service.add_favorite(user_id=4, product_id=5)
+        
+        text = registry.render_prometheus()
+        assert 'repo_calls_total{repo="product_repo",method="fetch_product_by_id"} 1' in text
+        assert 'repo_calls_total{repo="favorites_repo",method="add_favorite"} 1' in text
+        assert 'repo_roundtrips_per_request_count 1' in text
+        assert 'repo_roundtrips_per_request_sum 2' in text
+
+    def test_b145_disabled_registry_no_wrapping(self, mock_product_repo):
+        """Б145: При выключенных метриках методы сервиса не оборачиваются"""
+        registry = MetricsRegistry(enabled=False)
+        service = CatalogService(product_repo=mock_product_repo)
+        
+        instrumented = instrument_service(service, registry)
+        
+        assert instrumented is service
+        assert instrumented.get_categories.__func__ is CatalogService.get_categories
+        assert registry.render_prometheus() == ""
+
+    @pytest.mark.asyncio
+    async def test_b146_metrics_http_endpoint(self, mock_product_repo):
+        """Б146: Локальный HTTP-эндпоинт /metrics отдаёт метрики в текстовом формате Prometheus"""
+        registry = MetricsRegistry()
+        service = instrument_service(CatalogService(product_repo=mock_product_repo), registry)
+        await service.get_categories()
+        server = await start_metrics_server(registry, host="127.0.0.1", port=0)
+        port = server.sockets[0].getsockname()[1]
+        
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        
+        assert response.startswith("HTTP/1.1 200")
+        assert "text/plain; version=0.0.4" in response
+        assert 'service_calls_total{service="CatalogService",method="get_categories"} 1' in response
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("service_name", list(SERVICE_CALLS))
+    async def test_b194_every_service_instrumented(self, request, service_name):
+        """Б194: Каждый из девяти сервисов магазина инструментируется: вызов учитывается в счётчике и гистограмме"""
+        build, method, args, kwargs = SERVICE_CALLS[service_name]
+        registry = MetricsRegistry()
+        service = instrument_service(build(request.getfixturevalue), registry)
+        
+        await getattr(service, method)(*args, **kwargs)
+        text = registry.render_prometheus()
+        
+        assert f'service_calls_total{{service="{service_name}",method="{method}"}} 1' in text
+        assert f'service_call_duration_seconds_count{{service="{service_name}",method="{method}"}} 1' in text
@@ -1,8 +1,9 @@
 """
 Блочные тесты модуля уведомлений (NotificationService).
-Тесты Б76-Б79.
+Тесты Б76-Б79, Б111-Б116.
 """
 
+import asyncio
 import pytest
 from decimal import Decimal
 from app.services.notification_service import NotificationService
@@ -66,3 +67,117 @@ class TestNotificationService:
         admin_ids = {msg['chat_id'] for msg in mock_bot.sent_messages}
         assert 100008 in admin_ids
         assert 100009 in admin_ids
+
+    @pytest.mark.asyncio
+    async def test_b111_notify_admin_error_isolated(self, notification_service, sample_order, mock_bot):
+        """Б111: Ошибка отправки одному админу не мешает уведомить остальных"""
+        send_message = mock_bot.send_message
+        
+        async def failing_send(chat_id, text, **kwargs):
+            if chat_id == 100008:
+                raise ConnectionError("bot was blocked by the user")
+            return await send_message(chat_id, text, **kwargs)
+        
+        mock_bot.send_message = failing_send
+        
+        await notification_service.notify_admin_new_order(sample_order)
+        
+        assert [msg['chat_id'] for msg in mock_bot.sent_messages] == [100009]
+
+    @pytest.mark.asyncio
+    async def test_b112_notify_admin_concurrent_bounded(self, mock_bot, mock_user_repo, sample_order):
+        """Б112: Рассылка админам идёт параллельно, но не более admin_fanout_limit отправок одновременно"""
+        admin_ids = list(range(100010, 100016))
+        service = NotificationService(
+            bot=mock_bot, user_repo=mock_user_repo,
+            config={'admin_ids': admin_ids, 'admin_fanout_limit': 3}
+        )
+        send_message = mock_bot.send_message
+        in_flight = []
+        peak = []
+        
+        async def slow_send(chat_id, text, **kwargs):
+            in_flight.append(chat_id)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(chat_id)
+            return await send_message(chat_id, text, **kwargs)
+        
+        mock_bot.send_message = slow_send
+        
+        await service.notify_admin_new_order(sample_order)
+        
+        assert {msg['chat_id'] for msg in mock_bot.sent_messages} == set(admin_ids)
+        assert max(peak) == 3
+
+    @pytest.mark.asyncio
+    async def test_b113_notify_admin_digest(self, mock_bot, mock_user_repo, mock_clock):
+        """Б113: Заказы, пришедшие в пределах окна, отправляются админу одним сводным сообщением"""
+        service = NotificationService(
+            bot=mock_bot, user_repo=mock_user_repo,
+            config={'admin_ids': [100008, 100009], 'admin_digest_window': 10},
+            clock=mock_clock
+        )
+        for i in range(1, 4):
+            order = MockOrder(id=i, user_id=1, order_number=f"ORD-20241201-000{i}", total=89990)
+            await service.notify_admin_new_order(order)
+            await mock_clock.sleep(1)
+        
+        assert mock_bot.sent_messages == []
+        
+        await mock_clock.sleep(10)
+        await service.flush_admin_digest()
+        
+        assert len(mock_bot.sent_messages) == 2
+        for msg in mock_bot.sent_messages:
+            assert all(f"ORD-20241201-000{i}" in msg['text'] for i in range(1, 4))
+
+    @pytest.fixture
+    def coalescing_service(self, mock_bot, mock_user_repo, mock_clock):
+        return NotificationService(
+            bot=mock_bot, user_repo=mock_user_repo,
+            config={'admin_ids': [100008, 100009], 'status_coalesce_window': 5},
+            clock=mock_clock
+        )
+
+    @pytest.mark.asyncio
+    async def test_b114_status_notifications_coalesced(self, coalescing_service, mock_bot, mock_clock):
+        """Б114: Быстрая смена статусов created→confirmed→paid→shipped даёт одно сообщение о последнем статусе"""
+        order = MockOrder(id=3, user_id=1, order_number="ORD-20241202-0001", total=49990)
+        for status in ('confirmed', 'paid', 'shipped'):
+            order.status = status
+            await coalescing_service.notify_status_changed(order)
+            await mock_clock.sleep(1)
+        
+        assert mock_bot.sent_messages == []
+        
+        await mock_clock.sleep(5)
+        await coalescing_service.flush_status_notifications()
+        
+        assert len(mock_bot.sent_messages) == 1
+        text = mock_bot.sent_messages[0]['text']
+        assert "отправлен" in text.lower() or "🚚" in text
+
+    @pytest.mark.asyncio
+    async def test_b115_payment_success_not_coalesced(self, coalescing_service, mock_bot):
+        """Б115: Уведомление об оплате отправляется сразу, без окна объединения"""
+        order = MockOrder(id=2, user_id=1, order_number="ORD-20241201-0002", total=129990, status='paid')
+        
+        await coalescing_service.notify_payment_success(order)
+        
+        assert len(mock_bot.sent_messages) == 1
+        assert "оплат" in mock_bot.sent_messages[0]['text'].lower()
+
+    @pytest.mark.asyncio
+    async def test_b116_status_notifications_coalesced_per_order(self, coalescing_service, mock_bot, mock_clock):
+        """Б116: Объединение статусов выполняется отдельно для каждого заказа"""
+        first = MockOrder(id=1, user_id=1, order_number="ORD-20241201-0001", total=89990, status='confirmed')
+        second = MockOrder(id=4, user_id=2, order_number="ORD-20241202-0002", total=79990, status='shipped')
+        
+        await coalescing_service.notify_status_changed(first)
+        await coalescing_service.notify_status_changed(second)
+        await mock_clock.sleep(5)
+        await coalescing_service.flush_status_notifications()
+        
+        assert len(mock_bot.sent_messages) == 2
+        assert {msg['chat_id'] for msg in mock_bot.sent_messages} == {100001, 100002}
@@ -1,6 +1,6 @@
 """
 Блочные тесты модуля профиля (ProfileService).
-Тесты Б65-Б70.
+Тесты Б65-Б70, Б127.
 """
 
 import pytest
@@ -77,3 +77,12 @@ class TestProfileService:
         
         with pytest.raises(OrderNotFoundError):
             await service.repeat_order(user_id=1, order_id=4)
+
+    @pytest.mark.asyncio
+    async def test_b127_update_profile_normalizes_phone(self, mock_user_repo, mock_order_repo):
+        """Б127: Обновление профиля сохраняет телефон в каноническом виде +7XXXXXXXXXX"""
+        service = ProfileService(user_repo=mock_user_repo, order_repo=mock_order_repo)
+        
+        profile = await service.update_profile(user_id=1, data=ProfileUpdate(phone="8 999 765-43-21"))
+        
+        assert profile.phone == "+79997654321"
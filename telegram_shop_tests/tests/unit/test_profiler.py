@@ -0,0 +1,65 @@
+"""
+Блочные тесты профилировщика по команде администратора (ProfilerService).
+Тесты Б147-Б149.
+
+Профилировщик снимает стеки только в процессе бота: цикл событий и пул
+потоков. Воркеры процессного пула рендеринга чеков (ReceiptService с
+render_executor) — отдельные процессы, в отчёт они не попадают.
+"""
+
+import asyncio
+import re
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from app.services.profiler_service import ProfilerService
+from app.exceptions import PermissionDeniedError
+
+
+def busy_receipt_render(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+
+
+class TestProfilerService:
+
+    @pytest.fixture
+    def profiler_service(self, mock_bot, mock_user_repo, tmp_path):
+        return ProfilerService(
+            bot=mock_bot, user_repo=mock_user_repo, output_dir=str(tmp_path), sample_interval=0.005
+        )
+
+    @pytest.mark.asyncio
+    async def test_b147_profile_command_requires_admin(self, profiler_service, mock_bot):
+        """Б147: Команда профилирования от обычного пользователя вызывает PermissionDeniedError"""
+        with pytest.raises(PermissionDeniedError):
+            await profiler_service.handle_profile_command(user_id=1, chat_id=100001, seconds=0.1)
+        
+        assert mock_bot.sent_documents == []
+
+    @pytest.mark.asyncio
+    async def test_b148_profile_command_sends_collapsed_stacks(self, profiler_service, mock_bot):
+        """Б148: Админ получает файл в формате collapsed stacks и отчёт о лаге цикла событий"""
+        await profiler_service.handle_profile_command(user_id=8, chat_id=100008, seconds=0.2)
+        
+        assert len(mock_bot.sent_documents) == 1
+        sent = mock_bot.sent_documents[0]
+        assert sent['chat_id'] == 100008
+        lines = Path(sent['document']).read_text().splitlines()
+        assert len(lines) > 0
+        assert all(re.fullmatch(r".+ \d+", line) for line in lines)
+        assert "лаг" in sent['caption'].lower()
+
+    @pytest.mark.asyncio
+    async def test_b149_profile_samples_worker_threads(self, profiler_service, mock_bot):
+        """Б149: Профилировщик снимает стеки потоков пула воркеров (поиск, чеки без процессного пула)"""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            busy = loop.run_in_executor(pool, busy_receipt_render, 0.5)
+            await profiler_service.handle_profile_command(user_id=8, chat_id=100008, seconds=0.2)
+            await busy
+        
+        stacks = Path(mock_bot.sent_documents[0]['document']).read_text()
+        assert "busy_receipt_render" in stacks
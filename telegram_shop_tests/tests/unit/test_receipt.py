@@ -1,15 +1,46 @@
 """
 Блочные тесты модуля чеков (ReceiptService).
-Тесты Б71-Б75.
+Тесты Б71-Б75, Б96-Б100, Б102-Б105.
 """
 
+import asyncio
+import pickle
+import threading
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
 from unittest.mock import AsyncMock
 from app.services.receipt_service import ReceiptService
 from app.exceptions import OrderNotFoundError, OrderNotPaidError
-from tests.conftest import MockOrderItem
+from tests.conftest import MockOrder, MockOrderItem
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args)
+        
+        def tracked():
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                time.sleep(0.05)
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        
+        return super().submit(tracked)
 
 
 class TestReceiptService:
@@ -72,3 +103,145 @@ class TestReceiptService:
         
         assert result == True
         assert len(mock_bot.sent_documents) == 1
+
+    @pytest.fixture
+    def render_executor(self):
+        executor = RecordingExecutor(max_workers=4)
+        yield executor
+        executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_b96_generate_receipt_pdf_off_loop(self, mock_order_repo, mock_bot, tmp_path, render_executor):
+        """Б96: Рендеринг PDF выполняется в пуле, воркеру передаются только данные чека"""
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(1, 2, 3, "Samsung Galaxy S24", Decimal('79990'), 1)
+        ])
+        service = ReceiptService(
+            order_repo=mock_order_repo, bot=mock_bot, receipts_dir=str(tmp_path / "receipts"),
+            render_executor=render_executor
+        )
+        
+        filepath = await service.generate_receipt_pdf(order_id=2)
+        
+        assert Path(filepath).exists()
+        assert len(render_executor.submitted) == 1
+        payload = render_executor.submitted[0]
+        assert any(getattr(arg, 'order_number', None) == "ORD-20241201-0002" for arg in payload)
+        pickle.dumps(payload)
+
+    @pytest.mark.asyncio
+    async def test_b97_generate_receipt_pdf_backpressure(
+        self, mock_order_repo, mock_bot, tmp_path, render_executor, test_orders
+    ):
+        """Б97: При max_pending_renders=2 одновременно рендерится не более 2 чеков, остальные ждут"""
+        test_orders.extend(
+            MockOrder(order_id, 1, f"ORD-20241205-000{order_id}", 79990, status='paid') for order_id in (6, 7, 8)
+        )
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(1, 2, 3, "Samsung Galaxy S24", Decimal('79990'), 1)
+        ])
+        service = ReceiptService(
+            order_repo=mock_order_repo, bot=mock_bot, receipts_dir=str(tmp_path / "receipts"),
+            render_executor=render_executor, max_pending_renders=2
+        )
+        
+        paths = await asyncio.gather(*[service.generate_receipt_pdf(order_id=order_id) for order_id in (2, 4, 6, 7, 8)])
+        
+        assert len(set(paths)) == 5
+        assert len(render_executor.submitted) == 5
+        assert render_executor.max_in_flight <= 2
+
+    @pytest.mark.asyncio
+    async def test_b98_generate_receipt_pdf_cached(self, receipt_service):
+        """Б98: Повторная генерация чека для неизменённого заказа возвращает файл из кэша без рендеринга"""
+        first = await receipt_service.generate_receipt_pdf(order_id=2)
+        mtime = Path(first).stat().st_mtime_ns
+        
+        second = await receipt_service.generate_receipt_pdf(order_id=2)
+        
+        assert second == first
+        assert Path(second).stat().st_mtime_ns == mtime
+
+    @pytest.mark.asyncio
+    async def test_b99_send_order_receipt_reuses_file_id(self, receipt_service, mock_bot):
+        """Б99: Повторная отправка чека ссылается на file_id Telegram без повторной загрузки файла"""
+        await receipt_service.send_order_receipt(user_id=100001, order_id=2)
+        await receipt_service.send_order_receipt(user_id=100001, order_id=2)
+        
+        assert len(mock_bot.sent_documents) == 2
+        assert mock_bot.sent_documents[0]['document'] != "file-id-1"
+        assert mock_bot.sent_documents[1]['document'] == "file-id-1"
+
+    @pytest.mark.asyncio
+    async def test_b100_receipt_cache_invalidated_on_order_change(self, receipt_service, mock_order_repo, mock_bot):
+        """Б100: Изменение состава заказа сбрасывает кэш чека и file_id"""
+        first = await receipt_service.generate_receipt_pdf(order_id=2)
+        await receipt_service.send_order_receipt(user_id=100001, order_id=2)
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(1, 2, 3, "Samsung Galaxy S24", Decimal('79990'), 2)
+        ])
+        
+        second = await receipt_service.generate_receipt_pdf(order_id=2)
+        await receipt_service.send_order_receipt(user_id=100001, order_id=2)
+        
+        assert second != first
+        assert mock_bot.sent_documents[1]['document'] != "file-id-1"
+
+    @pytest.mark.asyncio
+    async def test_b102_generate_receipt_pdf_200_lines_cyrillic(self, mock_order_repo, mock_bot, tmp_path):
+        """Б102: Чек на 200 позиций с кириллицей записывается в файл размером 1KB-500KB"""
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(i, 2, 7, f"Чехол для смартфона №{i}", Decimal('1990'), 1)
+            for i in range(1, 201)
+        ])
+        service = ReceiptService(
+            order_repo=mock_order_repo, bot=mock_bot, receipts_dir=str(tmp_path / "receipts")
+        )
+        
+        filepath = await service.generate_receipt_pdf(order_id=2)
+        
+        content = Path(filepath).read_bytes()
+        assert content.startswith(b"%PDF")
+        assert 1000 <= len(content) <= 500000
+
+    @pytest.fixture
+    def batch_service(self, mock_order_repo, tmp_path):
+        mock_order_repo._items[2] = [MockOrderItem(1, 2, 3, "Samsung Galaxy S24", Decimal('79990'), 1)]
+        mock_order_repo._items[4] = [MockOrderItem(2, 4, 9, "AirPods Pro 2", Decimal('24990'), 2)]
+        return ReceiptService(order_repo=mock_order_repo, receipts_dir=str(tmp_path / "receipts"))
+
+    @pytest.mark.asyncio
+    async def test_b103_generate_receipts_batch_summary(self, batch_service, mock_order_repo):
+        """Б103: Пакетная генерация по списку заказов возвращает сводку generated/skipped/failed"""
+        summary = await batch_service.generate_receipts_batch(
+            order_ids=iter([1, 2, 4, 99999]), concurrency=2, batch_size=2
+        )
+        
+        assert summary.generated == 2
+        assert summary.skipped == 1
+        assert summary.failed == 1
+        assert mock_order_repo.get_order_items_batch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_b104_generate_receipts_batch_date_range(self, batch_service):
+        """Б104: Пакетная генерация за период формирует чеки всех оплаченных заказов"""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        summary = await batch_service.generate_receipts_batch(
+            date_from=today, date_to=today + timedelta(days=1)
+        )
+        
+        assert summary.generated == 2
+        assert summary.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_b105_generate_receipts_batch_resumable(self, batch_service, tmp_path):
+        """Б105: Повторный запуск с файлом прогресса пропускает уже обработанные заказы"""
+        progress_file = str(tmp_path / "progress.json")
+        
+        first = await batch_service.generate_receipts_batch(order_ids=[2, 4], progress_file=progress_file)
+        second = await batch_service.generate_receipts_batch(order_ids=[2, 4], progress_file=progress_file)
+        
+        assert first.generated == 2
+        assert second.generated == 0
+        assert second.skipped == 2
@@ -0,0 +1,69 @@
+"""
+Блочные тесты движка рендеринга чеков (get_receipt_renderer).
+Тесты Б101, Б184.
+"""
+
+import io
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from app.services.receipt_renderer import get_receipt_renderer
+from app.services.receipt_service import ReceiptService
+from tests.conftest import MockOrderItem
+
+
+class RecordingFile(io.RawIOBase):
+    """Приёмник PDF, запоминающий размер каждой записи."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(len(data))
+        return len(data)
+
+
+class TestReceiptRenderer:
+
+    @pytest.fixture
+    def receipt_service(self, mock_order_repo, mock_bot, tmp_path):
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(1, 2, 3, "Samsung Galaxy S24", Decimal('79990'), 1),
+            MockOrderItem(2, 2, 9, "AirPods Pro 2", Decimal('24990'), 2)
+        ])
+        return ReceiptService(
+            order_repo=mock_order_repo, bot=mock_bot, receipts_dir=str(tmp_path / "receipts")
+        )
+
+    @pytest.mark.asyncio
+    async def test_b101_receipt_renderer_loaded_once(self, receipt_service, tmp_path):
+        """Б101: Шрифты и макет чека загружаются один раз на процесс и переиспользуются"""
+        renderer = get_receipt_renderer()
+        data = await receipt_service.get_receipt_data(order_id=2)
+        
+        renderer.render(data, str(tmp_path / "first.pdf"))
+        renderer.render(data, str(tmp_path / "second.pdf"))
+        
+        assert get_receipt_renderer() is renderer
+        assert renderer.font_load_count == 1
+
+    @pytest.mark.asyncio
+    async def test_b184_receipt_streamed_to_output(self, receipt_service, mock_order_repo):
+        """Б184: Чек на 200 позиций пишется в файл по частям, документ целиком в памяти не собирается"""
+        mock_order_repo.get_order_items = AsyncMock(return_value=[
+            MockOrderItem(i, 2, 7, f"Чехол для смартфона №{i}", Decimal('1990'), 1)
+            for i in range(1, 201)
+        ])
+        data = await receipt_service.get_receipt_data(order_id=2)
+        output = RecordingFile()
+        
+        get_receipt_renderer().render(data, output)
+        
+        total = sum(output.chunks)
+        assert total >= 1000
+        assert len(output.chunks) > 1
+        assert max(output.chunks) < total / 2
@@ -0,0 +1,56 @@
+"""
+Блочные тесты кэшируемого рендеринга сообщений (MessageRenderer).
+Тесты Б121-Б123.
+"""
+
+from decimal import Decimal
+from app.utils.helpers import format_price
+from app.utils.render import MessageRenderer
+
+
+class TestMessageRenderer:
+    """Тесты кэшируемого рендеринга сообщений"""
+
+    def test_b121_product_card_cached_by_catalog_version(self, test_products):
+        """Б121: Карточка товара кэшируется по (product_id, версия каталога)"""
+        renderer = MessageRenderer(cache_size=100)
+        product = test_products[2]
+        
+        first = renderer.render_product_card(product, catalog_version=1)
+        second = renderer.render_product_card(product, catalog_version=1)
+        product.price = Decimal('74990')
+        updated = renderer.render_product_card(product, catalog_version=2)
+        
+        assert second is first
+        assert "Samsung Galaxy S24" in first
+        assert format_price(Decimal('79990')) in first
+        assert format_price(Decimal('74990')) in updated
+        assert renderer.cache_info().hits == 1
+        assert renderer.cache_info().misses == 2
+
+    def test_b122_product_card_cache_bounded(self, test_products):
+        """Б122: LRU-кэш карточек не превышает заданный размер"""
+        renderer = MessageRenderer(cache_size=2)
+        
+        for product in test_products[:3]:
+            renderer.render_product_card(product, catalog_version=1)
+        
+        assert renderer.cache_info().currsize == 2
+
+    def test_b123_precomputed_locale_tables(self):
+        """Б123: Предвычисленные таблицы рендерера дают те же склонения и цены, что и правило"""
+        renderer = MessageRenderer(cache_size=0)
+        forms = ('товар', 'товара', 'товаров')
+        for n in range(0, 1000):
+            if n % 10 == 1 and n % 100 != 11:
+                expected = forms[0]
+            elif 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+                expected = forms[1]
+            else:
+                expected = forms[2]
+            assert renderer.plural_form(n, forms) == expected
+            assert renderer.format_price(n * 1000) == format_price(n * 1000)
+        
+        assert renderer.format_price(999) == "999 ₽"
+        assert renderer.format_price(1000) == "1 000 ₽"
+        assert renderer.format_price(Decimal('1234567')) == "1 234 567 ₽"
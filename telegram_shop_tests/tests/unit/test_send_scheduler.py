@@ -0,0 +1,95 @@
+"""
+Блочные тесты планировщика отправки сообщений (SendScheduler).
+Тесты Б106-Б110.
+"""
+
+import pytest
+from app.exceptions import SendQueueFullError
+from app.services.notification_service import NotificationService
+from app.services.send_scheduler import SendScheduler, Priority
+from tests.conftest import MockOrder, MockBot
+
+
+class TestSendScheduler:
+
+    @pytest.fixture
+    def sample_order(self):
+        return MockOrder(
+            id=1, user_id=1, order_number="ORD-20241201-0001", total=89990,
+            contact_name="Иван Тестовый", contact_phone="+7 999 111-11-11",
+            contact_address="г. Москва, ул. Тестовая, д. 1"
+        )
+
+    @pytest.fixture
+    def clocked_bot(self, mock_clock):
+        return MockBot(clock=mock_clock)
+
+    @pytest.fixture
+    def scheduler(self, clocked_bot, mock_clock):
+        return SendScheduler(bot=clocked_bot, clock=mock_clock, global_rate=30, per_chat_rate=1)
+
+    @pytest.mark.asyncio
+    async def test_b106_scheduler_global_rate_limit(self, scheduler, clocked_bot):
+        """Б106: Планировщик отправляет не более 30 сообщений в секунду на все чаты"""
+        for chat_id in range(1, 91):
+            await scheduler.enqueue(chat_id, "Распродажа!", priority=Priority.MARKETING)
+        
+        await scheduler.drain()
+        
+        sent_at = [msg['sent_at'] for msg in clocked_bot.sent_messages]
+        assert len(sent_at) == 90
+        for start in sent_at:
+            assert len([t for t in sent_at if start <= t < start + 1.0]) <= 30
+
+    @pytest.mark.asyncio
+    async def test_b107_scheduler_per_chat_rate_limit(self, scheduler, clocked_bot):
+        """Б107: В один чат уходит не более одного сообщения в секунду"""
+        for i in range(3):
+            await scheduler.enqueue(100001, f"Сообщение {i}", priority=Priority.TRANSACTIONAL)
+        
+        await scheduler.drain()
+        
+        sent_at = [msg['sent_at'] for msg in clocked_bot.sent_messages]
+        assert [msg['text'] for msg in clocked_bot.sent_messages] == ["Сообщение 0", "Сообщение 1", "Сообщение 2"]
+        assert all(b - a >= 1.0 for a, b in zip(sent_at, sent_at[1:]))
+
+    @pytest.mark.asyncio
+    async def test_b108_scheduler_transactional_ahead_of_bulk(self, scheduler, clocked_bot, mock_user_repo, sample_order):
+        """Б108: Транзакционное уведомление не ждёт очередь маркетинговой рассылки"""
+        service = NotificationService(
+            bot=clocked_bot, user_repo=mock_user_repo, config={'admin_ids': [100008, 100009]},
+            scheduler=scheduler
+        )
+        for chat_id in range(200001, 200101):
+            await scheduler.enqueue(chat_id, "Распродажа!", priority=Priority.MARKETING)
+        await scheduler.enqueue(100008, "Админ", priority=Priority.ADMIN)
+        
+        await service.notify_order_created(sample_order)
+        await scheduler.drain()
+        
+        chat_ids = [msg['chat_id'] for msg in clocked_bot.sent_messages]
+        assert chat_ids[0] == 100001
+        assert chat_ids[1] == 100008
+        assert clocked_bot.sent_messages[0]['sent_at'] < 1.0
+
+    @pytest.mark.asyncio
+    async def test_b109_scheduler_retry_after(self, scheduler, clocked_bot):
+        """Б109: Ответ 429 с retry_after откладывает повторную отправку, сообщение доставляется один раз"""
+        clocked_bot.retry_after[100001] = 5
+        
+        await scheduler.enqueue(100001, "Заказ оплачен", priority=Priority.TRANSACTIONAL)
+        await scheduler.drain()
+        
+        assert len(clocked_bot.sent_messages) == 1
+        assert clocked_bot.sent_messages[0]['sent_at'] >= 5
+
+    @pytest.mark.asyncio
+    async def test_b110_scheduler_bounded_queue(self, clocked_bot, mock_clock):
+        """Б110: Переполнение очереди рассылки вызывает SendQueueFullError, транзакционные принимаются"""
+        scheduler = SendScheduler(bot=clocked_bot, clock=mock_clock, max_queue_size=10)
+        for chat_id in range(1, 11):
+            await scheduler.enqueue(chat_id, "Распродажа!", priority=Priority.MARKETING)
+        
+        with pytest.raises(SendQueueFullError):
+            await scheduler.enqueue(11, "Распродажа!", priority=Priority.MARKETING)
+        await scheduler.enqueue(100001, "Заказ оплачен", priority=Priority.TRANSACTIONAL)
@@ -0,0 +1,223 @@
+"""
+Блочные тесты шардирования воркеров (tests.sharding).
+Тесты Б158-Б163, Б185-Б186.
+"""
+
+import asyncio
+import os
+import pytest
+import sqlite3
+from collections import Counter
+from tests.inmemory import ProductRecord
+from tests.sharding.replay import CATALOG_PRODUCTS, PROMO_CODE, load_updates, record_updates, replay, shop_handler
+from tests.sharding.ring import HashRing
+from tests.sharding.supervisor import Supervisor
+from tests.sqlite_backend import SQLiteBackend
+
+
+SEQUENCE_LOG = """
+CREATE TABLE sequence_log (
+    user_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    update_id INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    PRIMARY KEY (user_id, seq)
+)
+"""
+
+
+async def sequence_handler(update, context):
+    """Проверяет по журналу в общем хранилище, что предыдущий апдейт пользователя уже обработан.
+
+    Повторная обработка апдейта нарушает первичный ключ журнала и попадает в supervisor.errors.
+    """
+    pool = context.store.pool
+    in_order = update['seq'] == 1 or await pool.fetchone(
+        "SELECT 1 FROM sequence_log WHERE user_id = ? AND seq = ?", (update['user_id'], update['seq'] - 1)
+    ) is not None
+    await pool.execute(
+        "INSERT INTO sequence_log (user_id, seq, update_id, pid) VALUES (?, ?, ?, ?)",
+        (update['user_id'], update['seq'], update['update_id'], os.getpid())
+    )
+    return in_order
+
+
+async def slow_sequence_handler(update, context):
+    await asyncio.sleep(0.01)
+    return await sequence_handler(update, context)
+
+
+def sequence_log(store_path):
+    conn = sqlite3.connect(store_path)
+    try:
+        return conn.execute("SELECT user_id, seq, update_id, pid FROM sequence_log ORDER BY update_id").fetchall()
+    finally:
+        conn.close()
+
+
+async def checkout_handler(update, context):
+    return await context.store.product_repo.reserve_stock(update['product_id'], 1)
+
+
+async def crashing_handler(update, context):
+    if update.get('crash'):
+        os._exit(1)
+    return update['update_id']
+
+
+def user_updates(users, per_user, start=1):
+    return [
+        {'update_id': (seq - 1) * users + user_id, 'user_id': user_id, 'seq': seq}
+        for seq in range(start, start + per_user) for user_id in range(1, users + 1)
+    ]
+
+
+class TestSharding:
+
+    @pytest.fixture
+    def store_path(self, tmp_path):
+        path = str(tmp_path / "shared.sqlite3")
+        SQLiteBackend(path).seed(products=[ProductRecord(1, "Товар", 1000, stock=50)]).close()
+        conn = sqlite3.connect(path)
+        conn.execute(SEQUENCE_LOG)
+        conn.close()
+        return path
+
+    def test_b158_hash_ring_moves_few_keys(self):
+        """Б158: Ключи распределяются по всем воркерам, при добавлении пятого переезжает ~1/5 ключей"""
+        ring = HashRing([f"worker-{i}" for i in range(4)])
+        before = {user_id: ring.node_for(user_id) for user_id in range(10_000)}
+        
+        ring.add("worker-4")
+        moved = [user_id for user_id in before if ring.node_for(user_id) != before[user_id]]
+        
+        assert set(Counter(before.values())) == {f"worker-{i}" for i in range(4)}
+        assert all(ring.node_for(user_id) == "worker-4" for user_id in moved)
+        assert 0.1 < len(moved) / len(before) < 0.3
+
+    def test_b159_user_updates_ordered_within_worker(self, store_path):
+        """Б159: Апдейты пользователя обрабатываются одним воркером строго по порядку"""
+        updates = user_updates(users=40, per_user=5)
+        
+        with Supervisor(sequence_handler, workers=4, store_path=store_path) as supervisor:
+            for update in updates:
+                supervisor.dispatch(update)
+            supervisor.wait_idle()
+        
+        assert supervisor.errors == {}
+        assert all(in_order for _, in_order in supervisor.results.values())
+        assert len(sequence_log(store_path)) == len(updates)
+        workers_by_user = {}
+        for update in updates:
+            workers_by_user.setdefault(update['user_id'], set()).add(supervisor.results[update['update_id']][0])
+        assert all(len(workers) == 1 for workers in workers_by_user.values())
+        assert len({worker for workers in workers_by_user.values() for worker in workers}) == 4
+
+    def test_b160_shared_stock_not_oversold(self, store_path):
+        """Б160: 200 покупателей в 4 воркерах на остаток 50 — ровно 50 резервов, остаток 0"""
+        with Supervisor(checkout_handler, workers=4, store_path=store_path) as supervisor:
+            for user_id in range(1, 201):
+                supervisor.dispatch({'update_id': user_id, 'user_id': user_id, 'product_id': 1})
+            supervisor.wait_idle()
+        
+        backend = SQLiteBackend(store_path)
+        product = asyncio.run(backend.product_repo.fetch_product_by_id(1))
+        backend.close()
+        assert sum(reserved for _, reserved in supervisor.results.values()) == 50
+        assert product.stock == 0
+
+    def test_b161_restart_worker_keeps_queue(self, store_path):
+        """Б161: Перезапуск воркера с необработанной очередью не теряет, не дублирует и не переупорядочивает апдейты"""
+        first, second = user_updates(users=20, per_user=3), user_updates(users=20, per_user=3, start=4)
+        with Supervisor(slow_sequence_handler, workers=2, store_path=store_path) as supervisor:
+            restarted_users = {u for u in range(1, 21) if supervisor.worker_for(u) == "worker-0"}
+            for update in first:
+                supervisor.dispatch(update)
+            supervisor.restart_worker("worker-0")
+            for update in second:
+                supervisor.dispatch(update)
+            supervisor.wait_idle()
+        
+        log = sequence_log(store_path)
+        new_pid = [pid for user_id, _, _, pid in log if user_id in restarted_users][-1]
+        pending_at_restart = [
+            update_id for user_id, _, update_id, pid in log
+            if user_id in restarted_users and update_id <= len(first) and pid == new_pid
+        ]
+        assert supervisor.restarts == 1
+        assert supervisor.errors == {}
+        assert supervisor.processed == supervisor.dispatched == 120
+        assert sorted(update_id for _, _, update_id, _ in log) == list(range(1, 121))
+        assert all(in_order for _, in_order in supervisor.results.values())
+        assert pending_at_restart
+
+    def test_b162_resize_rebalances_after_barrier(self, store_path):
+        """Б162: При увеличении числа воркеров переехавшие пользователи сохраняют порядок апдейтов"""
+        with Supervisor(sequence_handler, workers=2, store_path=store_path) as supervisor:
+            before = {user_id: supervisor.worker_for(user_id) for user_id in range(1, 41)}
+            for update in user_updates(users=40, per_user=3):
+                supervisor.dispatch(update)
+            supervisor.resize(4)
+            for update in user_updates(users=40, per_user=3, start=4):
+                supervisor.dispatch(update)
+            supervisor.wait_idle()
+        
+        moved = [user_id for user_id, worker in before.items() if supervisor.worker_for(user_id) != worker]
+        assert supervisor.workers == [f"worker-{i}" for i in range(4)]
+        assert moved
+        assert all(in_order for _, in_order in supervisor.results.values())
+
+    def test_b163_recorded_updates_roundtrip(self, tmp_path):
+        """Б163: Записанный поток апдейтов воспроизводится без изменений, seq растёт по пользователю"""
+        path = record_updates(str(tmp_path / "updates.jsonl"), count=300, users=20)
+        
+        updates = load_updates(path)
+        
+        assert [u['update_id'] for u in updates] == list(range(1, 301))
+        last_seq = {}
+        for update in updates:
+            assert update['seq'] == last_seq.get(update['user_id'], 0) + 1
+            last_seq[update['user_id']] = update['seq']
+        assert {u['action'] for u in updates} == {'add', 'checkout'}
+
+    def test_b185_crashed_worker_update_counted_as_error(self):
+        """Б185: Воркер, упавший посреди апдейта, перезапускается, а апдейт попадает в errors без зависания wait_idle"""
+        updates = [{'update_id': update_id, 'user_id': update_id} for update_id in range(1, 21)]
+        updates[9]['crash'] = True
+        
+        with Supervisor(crashing_handler, workers=2) as supervisor:
+            for update in updates:
+                supervisor.dispatch(update)
+            supervisor.wait_idle(timeout=30)
+            crashed_worker = supervisor.worker_for(10)
+        
+        assert supervisor.restarts == 1
+        assert supervisor.processed == supervisor.dispatched == 20
+        assert list(supervisor.errors) == [10]
+        assert supervisor.errors[10] == (crashed_worker, "worker exited with code 1")
+        assert {update_id: value for update_id, (_, value) in supervisor.results.items()} == {
+            update_id: update_id for update_id in range(1, 21) if update_id != 10
+        }
+
+    def test_b186_promo_claimed_once_per_user(self, tmp_path):
+        """Б186: При воспроизведении потока промокод применяется не больше одного раза на пользователя"""
+        store_path = str(tmp_path / "shop.sqlite3")
+        SQLiteBackend(store_path).seed(products=[
+            ProductRecord(product_id, f"Товар {product_id}", 1000, stock=10 ** 9)
+            for product_id in range(1, CATALOG_PRODUCTS + 1)
+        ]).close()
+        updates = load_updates(record_updates(str(tmp_path / "updates.jsonl"), count=300, users=20))
+        
+        with Supervisor(shop_handler, workers=2, store_path=store_path) as supervisor:
+            replay(supervisor, updates)
+        
+        backend = SQLiteBackend(store_path)
+        usages = asyncio.run(backend.promocode_repo.list_usages())
+        backend.close()
+        assert supervisor.errors == {}
+        promo_orders = Counter(
+            update['user_id'] for update in updates if supervisor.results[update['update_id']][1] == 'ordered'
+        )
+        assert all(count == 1 for count in promo_orders.values())
+        assert sorted(usages) == sorted((PROMO_CODE, user_id) for user_id in promo_orders)
+        assert 'ordered_full_price' in {outcome for _, outcome in supervisor.results.values()}
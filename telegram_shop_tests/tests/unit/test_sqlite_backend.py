@@ -0,0 +1,188 @@
+"""
+Блочные тесты SQLite-бэкенда репозиториев (SQLiteBackend).
+Тесты Б137-Б141, Б180-Б181, Б192-Б193.
+"""
+
+import asyncio
+import gc
+import pytest
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from tests.conftest import MockOrderItem
+from tests.money import to_kopecks
+from tests.sqlite_backend import MAX_VARIABLES, SQLiteBackend, transaction
+
+
+class TestSQLiteBackend:
+
+    @pytest.mark.asyncio
+    async def test_b137_products_by_category(self, sqlite_backend):
+        """Б137: Выборка товаров категории возвращает активные товары с ценой в Decimal"""
+        repo = sqlite_backend.product_repo
+        
+        products = await repo.fetch_products_by_category(1)
+        product = await repo.fetch_product_by_id(3)
+        
+        assert [p.id for p in products] == [1, 2, 3, 4, 50]
+        assert product.name == "Samsung Galaxy S24"
+        assert product.price == Decimal('79990')
+        assert await repo.fetch_product_by_id(99) is None
+        assert [c.name for c in await repo.fetch_categories()][0] == "Смартфоны"
+
+    @pytest.mark.asyncio
+    async def test_b138_cart_upsert_and_join(self, sqlite_backend):
+        """Б138: Повторный upsert обновляет количество, корзина содержит данные товара"""
+        repo = sqlite_backend.cart_repo
+        
+        await repo.upsert_cart_item(1, 3, 1)
+        await repo.upsert_cart_items_batch([(1, 3, 2), (1, 7, 5)])
+        await repo.delete_cart_item(1, 7)
+        items = await repo.get_cart_items(1)
+        
+        assert items == [{
+            'product_id': 3, 'qty': 2, 'name': "Samsung Galaxy S24",
+            'price': Decimal('79990'), 'stock': 10, 'is_active': True
+        }]
+
+    @pytest.mark.asyncio
+    async def test_b139_orders_and_items(self, sqlite_backend):
+        """Б139: Заказы пользователя, статус и позиции заказа читаются пакетно"""
+        repo = sqlite_backend.order_repo
+        await repo.insert_order(
+            SimpleNamespace(
+                id=6, user_id=2, order_number="ORD-20241204-0001", total=Decimal('3980.50'),
+                status='created', discount=Decimal('0'), contact_name='', contact_phone='',
+                contact_address='', payment_method='card', created_at=datetime.utcnow()
+            ),
+            [MockOrderItem(1, 6, 7, "Чехол iPhone", Decimal('1990.25'), 2)]
+        )
+        
+        await repo.update_order_status(6, 'paid')
+        order = await repo.get_order_by_id(6)
+        items = await repo.get_order_items_batch([6, 1])
+        
+        assert [o.id for o in await repo.list_orders_by_user(1)] == [1, 2, 3]
+        assert order.status == 'paid'
+        assert order.total == Decimal('3980.50')
+        assert [i.price for i in items[6]] == [Decimal('1990.25')]
+        assert items[1] == []
+
+    @pytest.mark.asyncio
+    async def test_b140_favorites_and_promocodes(self, sqlite_backend):
+        """Б140: Избранное в порядке добавления без неактивных, учёт промокодов пакетом"""
+        favorites = sqlite_backend.favorites_repo
+        promocodes = sqlite_backend.promocode_repo
+        for product_id in (5, 99, 2, 5):
+            await favorites.add_favorite(1, product_id)
+        await promocodes.record_usage_batch([("save10", 1, 1), ("SAVE20", 2, 2)])
+        
+        assert [p.id for p in await favorites.get_favorite_products(1)] == [5, 2]
+        assert [p.id for p in await favorites.get_favorite_products(1, limit=1, offset=1)] == [2]
+        assert await favorites.exists_favorites([(1, 2), (1, 3)]) == [True, False]
+        assert await promocodes.check_user_usage("SAVE10", 1) == True
+        assert (await promocodes.get_promocode_by_code("fixed5000")).discount_value == Decimal('5000')
+        assert [u.id for u in await sqlite_backend.user_repo.list_users_page(after_id=2, limit=3)] == [3, 4, 8]
+
+    @pytest.mark.asyncio
+    async def test_b141_concurrent_access_through_pool(self, sqlite_backend):
+        """Б141: Параллельные чтения и записи через пул соединений выполняются без блокировок"""
+        cart_repo = sqlite_backend.cart_repo
+        
+        await asyncio.gather(*[cart_repo.upsert_cart_item(user_id, 3, user_id) for user_id in range(1, 51)])
+        carts = await asyncio.gather(*[cart_repo.get_cart_items(user_id) for user_id in range(1, 51)])
+        reopened = SQLiteBackend(sqlite_backend.path)
+        
+        assert [cart[0]['qty'] for cart in carts] == list(range(1, 51))
+        assert (await reopened.cart_repo.get_cart_items(50))[0]['qty'] == 50
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_b180_cancelled_query_keeps_connection_until_done(self, tmp_path):
+        """Б180: Отмена ожидающей задачи не возвращает соединение в пул, пока поток с ним работает"""
+        backend = SQLiteBackend(str(tmp_path / "pool.sqlite3"), pool_size=1)
+        pool = backend.pool
+        started = threading.Event()
+        def slow_write(conn):
+            def write():
+                started.set()
+                time.sleep(0.2)
+                conn.execute("INSERT INTO cart_items (user_id, product_id, qty) VALUES (1, 1, 1)")
+            transaction(conn, write)
+        
+        task = asyncio.create_task(pool.run(slow_write))
+        await asyncio.to_thread(started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await backend.cart_repo.upsert_cart_item(2, 1, 1)
+        
+        rows = await pool.fetchall("SELECT user_id FROM cart_items ORDER BY user_id")
+        assert rows == [(1,), (2,)]
+        backend.close()
+
+    @pytest.mark.asyncio
+    async def test_b181_sub_kopeck_amounts_rounded_half_up(self, sqlite_backend):
+        """Б181: Доли копейки (например, после скидки) округляются до ближайшей копейки, а не отбрасываются"""
+        repo = sqlite_backend.order_repo
+        
+        await repo.insert_order(
+            SimpleNamespace(
+                id=7, user_id=2, order_number="ORD-20241204-0002", total=Decimal('899.991'),
+                status='created', discount=Decimal('99.999'), contact_name='', contact_phone='',
+                contact_address='', payment_method='card', created_at=datetime.utcnow()
+            ),
+            [MockOrderItem(2, 7, 7, "Чехол iPhone", Decimal('1990.255'), 1)]
+        )
+        order = await repo.get_order_by_id(7)
+        
+        assert to_kopecks(Decimal('0.005')) == 1
+        assert to_kopecks(Decimal('0.0049')) == 0
+        assert order.total == Decimal('899.99')
+        assert order.discount == Decimal('100.00')
+        assert (await repo.get_order_items(7))[0].price == Decimal('1990.26')
+
+    @pytest.mark.asyncio
+    async def test_b192_exists_favorites_batched(self, sqlite_backend):
+        """Б192: Пакетная проверка избранного делает один запрос на пачку пар, а не на пользователя"""
+        favorites = sqlite_backend.favorites_repo
+        for user_id in range(1, 11):
+            await favorites.add_favorite(user_id, user_id)
+        pairs = [(user_id, product_id) for user_id in range(1, 11) for product_id in range(1, 61)]
+        queries = []
+        fetchall = sqlite_backend.pool.fetchall
+        async def counting_fetchall(sql, params=()):
+            queries.append(sql)
+            return await fetchall(sql, params)
+        sqlite_backend.pool.fetchall = counting_fetchall
+        
+        result = await favorites.exists_favorites(pairs + pairs[:5])
+        
+        assert result == [user_id == product_id for user_id, product_id in pairs + pairs[:5]]
+        assert len(queries) == -(-len(pairs) // (MAX_VARIABLES // 2))
+
+    def test_b193_pool_recovers_after_closed_loop(self, tmp_path):
+        """Б193: Соединение, не вернувшееся из закрытого цикла событий, заменяется, пул остаётся рабочим"""
+        backend = SQLiteBackend(str(tmp_path / "pool.sqlite3"), pool_size=1)
+        started, finish = threading.Event(), threading.Event()
+        def hanging_query(conn):
+            started.set()
+            finish.wait(5)
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(backend.pool.run(hanging_query))
+        loop.run_until_complete(asyncio.to_thread(started.wait))
+        task.cancel()
+        loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        loop.close()
+        
+        rows = asyncio.run(backend.pool.fetchall("SELECT 1"))
+        
+        assert rows == [(1,)]
+        assert len(backend.pool._abandoned) == 1
+        finish.set()
+        backend.close()
+        # задача to_thread осталась в закрытом цикле; собираем её здесь, чтобы предупреждение попало в лог теста
+        del task, loop
+        gc.collect()
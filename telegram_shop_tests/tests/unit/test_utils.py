@@ -1,8 +1,9 @@
 """
 Блочные тесты вспомогательных функций (Utils).
-Тесты Б80-Б82.
+Тесты Б80-Б82, Б124-Б126.
 """
 
+import types
 import pytest
 from decimal import Decimal
 from app.utils.helpers import format_price, validate_phone, plural_form
@@ -67,3 +68,40 @@ class TestUtilsAdditional:
         """Склонение для 21: 'товар'"""
         result = plural_form(21, ('товар', 'товара', 'товаров'))
         assert result == 'товар'
+
+
+class TestPhoneNormalization:
+    """Тесты нормализации телефонов"""
+
+    def test_b124_normalize_phone(self):
+        """Б124: Нормализация телефона приводит к виду +7XXXXXXXXXX, невалидный → None"""
+        from app.utils.helpers import normalize_phone
+        for raw in ("+7 999 123-45-67", "+79991234567", "8 999 123-45-67", "89991234567"):
+            assert normalize_phone(raw) == "+79991234567"
+        for raw in ("59991234567", "123456", "abcdefghij", ""):
+            assert normalize_phone(raw) is None
+
+    def test_b125_validate_phone_matches_normalize(self):
+        """Б125: validate_phone сохраняет прежнее поведение и принимает ровно те номера, которые нормализуются"""
+        from app.utils.helpers import normalize_phone
+        expected = {
+            "+7 999 123-45-67": True, "+79991234567": True, "8 999 123-45-67": True, "89991234567": True,
+            "59991234567": False, "123456": False, "abcdefghij": False,
+            "+7 999 123-45-6": False, "+7 999 123-45-678": False,
+        }
+        
+        for raw, valid in expected.items():
+            assert validate_phone(raw) == valid
+            assert (normalize_phone(raw) is not None) == valid
+
+    def test_b126_normalize_phones_bulk(self):
+        """Б126: Пакетная нормализация — ленивый генератор, повторные номера возвращают один объект"""
+        from app.utils.helpers import normalize_phones
+        raw_phones = ["+7 999 111-11-11", "invalid", "89991111111", "+7 999 222-22-22"]
+        
+        result = normalize_phones(iter(raw_phones))
+        
+        assert isinstance(result, types.GeneratorType)
+        normalized = list(result)
+        assert normalized == ["+79991111111", None, "+79991111111", "+79992222222"]
+        assert normalized[0] is normalized[2]